@@ -5,12 +5,16 @@ from typing import Optional
 
 from .logging_setup import setup_logging
 
-# Initialize logging
-setup_logging()
-
 app = typer.Typer(help="Options paper trading bot for Interactive Brokers")
 
 
+@app.callback()
+def main():
+    """Initialize logging before running any command."""
+    # Done here rather than at import so importing the CLI has no side effects
+    setup_logging()
+
+
 @app.command()
 def doctor():
     """Verify connectivity, paper account, market data, and options chain."""
@@ -1,16 +1,81 @@
 """Configuration management from environment variables."""
 
 import os
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List
 from dotenv import load_dotenv
 
-load_dotenv()
 
+def _to_bool(value: str) -> bool:
+    """Parse a "true"/"false" environment value."""
+    return value.lower() == "true"
 
-@dataclass
+
+def _to_symbol_list(value: str) -> List[str]:
+    """Parse a comma-separated list of ticker symbols."""
+    return [s.strip().upper() for s in value.split(",")]
+
+
+# (Config attribute, environment variable, parser), applied in one pass
+_ENV_FIELDS: tuple[tuple[str, str, Callable[[str], object]], ...] = (
+    # IB Connection
+    ("ib_host", "IB_HOST", str),
+    ("ib_port", "IB_PORT", int),
+    ("ib_client_id", "IB_CLIENT_ID", int),
+    ("ib_readonly", "IB_READONLY", _to_bool),
+    ("ib_account_id", "IB_ACCOUNT_ID", str),
+    # Timezone
+    ("timezone", "TIMEZONE", str),
+    # Safety Settings
+    ("trading_disabled", "TRADING_DISABLED", _to_bool),
+    ("account_size", "ACCOUNT_SIZE", float),
+    ("risk_per_trade_pct", "RISK_PER_TRADE_PCT", float),
+    ("max_daily_loss_pct", "MAX_DAILY_LOSS_PCT", float),
+    ("max_trades_per_day", "MAX_TRADES_PER_DAY", int),
+    # Strategy Parameters
+    ("underlyings", "UNDERLYINGS", _to_symbol_list),
+    ("dte_min", "DTE_MIN", int),
+    ("dte_max", "DTE_MAX", int),
+    ("delta_min", "DELTA_MIN", float),
+    ("delta_max", "DELTA_MAX", float),
+    ("spread_width", "SPREAD_WIDTH", float),
+    ("leg_max_bidask", "LEG_MAX_BIDASK", float),
+    ("require_greeks", "REQUIRE_GREEKS", _to_bool),
+    ("otm_target_pct", "OTM_TARGET_PCT", float),
+    # Exit Management
+    ("tp_capture_pct", "TP_CAPTURE_PCT", float),
+    ("sl_multiple", "SL_MULTIPLE", float),
+    ("time_exit_dte", "TIME_EXIT_DTE", int),
+    # Execution
+    ("entry_window_start", "ENTRY_WINDOW_START", str),
+    ("entry_window_end", "ENTRY_WINDOW_END", str),
+    ("manage_interval_seconds", "MANAGE_INTERVAL_SECONDS", int),
+    ("entry_max_slippage", "ENTRY_MAX_SLIPPAGE", float),
+    ("entry_retry_seconds", "ENTRY_RETRY_SECONDS", int),
+    # Database
+    ("db_path", "DB_PATH", str),
+    # Cache
+    ("cache_dir", "CACHE_DIR", str),
+    # Logging
+    ("log_dir", "LOG_DIR", str),
+    ("log_max_bytes", "LOG_MAX_BYTES", int),
+    ("log_backup_count", "LOG_BACKUP_COUNT", int),
+    # AI Advisor
+    ("ai_advisor_enabled", "AI_ADVISOR_ENABLED", _to_bool),
+    ("ai_advisor_provider", "AI_ADVISOR_PROVIDER", str),
+    ("ai_advisor_model", "AI_ADVISOR_MODEL", str),
+    ("ai_advisor_api_url", "AI_ADVISOR_API_URL", str),
+    ("ai_advisor_api_key", "AI_ADVISOR_API_KEY", str),
+)
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Application configuration from environment variables."""
+    """Application configuration from environment variables.
+
+    Instances are immutable; use get_config() for the shared, cached instance.
+    """
 
     # IB Connection
     ib_host: str = "127.0.0.1"
@@ -30,7 +95,7 @@ class Config:
     max_trades_per_day: int = 2
 
     # Strategy Parameters
-    underlyings: List[str] = None
+    underlyings: List[str] = field(default_factory=lambda: ["SPY", "QQQ"])
     dte_min: int = 7
     dte_max: int = 21
     delta_min: float = 0.15
@@ -55,6 +120,9 @@ class Config:
     # Database
     db_path: str = "./data/bot.db"
 
+    # Cache
+    cache_dir: str = "./data/cache"
+
     # Logging
     log_dir: str = "./logs"
     log_max_bytes: int = 10485760
@@ -68,63 +136,20 @@ class Config:
     ai_advisor_api_key: str = ""
 
     def __post_init__(self):
-        """Parse environment variables after initialization."""
-        # IB Connection
-        self.ib_host = os.getenv("IB_HOST", self.ib_host)
-        self.ib_port = int(os.getenv("IB_PORT", self.ib_port))
-        self.ib_client_id = int(os.getenv("IB_CLIENT_ID", self.ib_client_id))
-        self.ib_readonly = os.getenv("IB_READONLY", "false").lower() == "true"
-        self.ib_account_id = os.getenv("IB_ACCOUNT_ID", self.ib_account_id)
-
-        # Timezone
-        self.timezone = os.getenv("TIMEZONE", self.timezone)
-
-        # Safety Settings
-        self.trading_disabled = os.getenv("TRADING_DISABLED", "true").lower() == "true"
-        self.account_size = float(os.getenv("ACCOUNT_SIZE", self.account_size))
-        self.risk_per_trade_pct = float(os.getenv("RISK_PER_TRADE_PCT", self.risk_per_trade_pct))
-        self.max_daily_loss_pct = float(os.getenv("MAX_DAILY_LOSS_PCT", self.max_daily_loss_pct))
-        self.max_trades_per_day = int(os.getenv("MAX_TRADES_PER_DAY", self.max_trades_per_day))
-
-        # Strategy Parameters
-        underlyings_str = os.getenv("UNDERLYINGS", "SPY,QQQ")
-        self.underlyings = [s.strip().upper() for s in underlyings_str.split(",")]
-        self.dte_min = int(os.getenv("DTE_MIN", self.dte_min))
-        self.dte_max = int(os.getenv("DTE_MAX", self.dte_max))
-        self.delta_min = float(os.getenv("DELTA_MIN", self.delta_min))
-        self.delta_max = float(os.getenv("DELTA_MAX", self.delta_max))
-        self.spread_width = float(os.getenv("SPREAD_WIDTH", self.spread_width))
-        self.leg_max_bidask = float(os.getenv("LEG_MAX_BIDASK", self.leg_max_bidask))
-        self.require_greeks = os.getenv("REQUIRE_GREEKS", "true").lower() == "true"
-        self.otm_target_pct = float(os.getenv("OTM_TARGET_PCT", self.otm_target_pct))
-
-        # Exit Management
-        self.tp_capture_pct = float(os.getenv("TP_CAPTURE_PCT", self.tp_capture_pct))
-        self.sl_multiple = float(os.getenv("SL_MULTIPLE", self.sl_multiple))
-        self.time_exit_dte = int(os.getenv("TIME_EXIT_DTE", self.time_exit_dte))
-
-        # Execution
-        self.entry_window_start = os.getenv("ENTRY_WINDOW_START", self.entry_window_start)
-        self.entry_window_end = os.getenv("ENTRY_WINDOW_END", self.entry_window_end)
-        self.manage_interval_seconds = int(os.getenv("MANAGE_INTERVAL_SECONDS", self.manage_interval_seconds))
-        self.entry_max_slippage = float(os.getenv("ENTRY_MAX_SLIPPAGE", self.entry_max_slippage))
-        self.entry_retry_seconds = int(os.getenv("ENTRY_RETRY_SECONDS", self.entry_retry_seconds))
-
-        # Database
-        self.db_path = os.getenv("DB_PATH", self.db_path)
-
-        # Logging
-        self.log_dir = os.getenv("LOG_DIR", self.log_dir)
-        self.log_max_bytes = int(os.getenv("LOG_MAX_BYTES", self.log_max_bytes))
-        self.log_backup_count = int(os.getenv("LOG_BACKUP_COUNT", self.log_backup_count))
-
-        # AI Advisor
-        self.ai_advisor_enabled = os.getenv("AI_ADVISOR_ENABLED", "false").lower() == "true"
-        self.ai_advisor_provider = os.getenv("AI_ADVISOR_PROVIDER", self.ai_advisor_provider)
-        self.ai_advisor_model = os.getenv("AI_ADVISOR_MODEL", self.ai_advisor_model)
-        self.ai_advisor_api_url = os.getenv("AI_ADVISOR_API_URL", self.ai_advisor_api_url)
-        self.ai_advisor_api_key = os.getenv("AI_ADVISOR_API_KEY", self.ai_advisor_api_key)
+        """Override defaults from environment variables."""
+        env = os.environ
+        for attr, key, coerce in _ENV_FIELDS:
+            value = env.get(key)
+            if value is not None:
+                object.__setattr__(self, attr, coerce(value))
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Load .env and build the configuration once per process."""
+    load_dotenv()
+    return Config()
 
 
 # Global config instance
-config = Config()
+config = get_config()
@@ -1,12 +1,68 @@
 """Database repository with CRUD operations."""
 
-from datetime import datetime, date
-from typing import List, Optional
-from sqlalchemy import create_engine, func
+import os
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import create_engine, event, insert, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 
 from .schema import Base, BotRun, MarketSnapshot, Trade, Order, Fill, DailyStats
 from ..config import config
+from ..json_utils import loads, pack
+from ..logging_setup import get_logger
+from ..time_utils import utcnow_naive
+
+logger = get_logger(__name__)
+
+# Stored in PRAGMA user_version once one-time data migrations have run;
+# 1 = legacy JSON text snapshots packed
+DB_USER_VERSION = 1
+
+# Applied to every new SQLite connection. WAL lets readers proceed while the
+# single writer commits; NORMAL sync is safe under WAL and avoids an fsync
+# per commit. page_size must come before journal_mode: it only takes effect
+# on a database with no tables yet and is a no-op afterwards.
+SQLITE_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure a freshly opened SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _create_sqlite_engine(db_path: str, pool_size: int) -> Engine:
+    """Create a pooled SQLite engine with long-lived connections."""
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_pre_ping=False,
+        connect_args={"check_same_thread": False, "timeout": 5.0},
+        future=True,
+    )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
 
 
 class Repository:
@@ -18,51 +74,118 @@ class Repository:
         from pathlib import Path
         db_path = Path(config.db_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        self.engine = create_engine(f"sqlite:///{config.db_path}", echo=False)
-        Base.metadata.create_all(self.engine)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+
+        # Reads share a pool of connections; writes go through a single
+        # connection since SQLite only allows one writer at a time anyway.
+        self.engine = _create_sqlite_engine(config.db_path, pool_size=max(2, os.cpu_count() or 1))
+        self.write_engine = _create_sqlite_engine(config.db_path, pool_size=1)
+        Base.metadata.create_all(self.write_engine)
+        self._create_missing_indexes()
+        self._migrate_data()
+        # Objects stay usable after commit without a refresh SELECT; the PK is
+        # populated by the INSERT itself (RETURNING on SQLite 3.35+)
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False, autoflush=False)
+        self.WriteSessionLocal = sessionmaker(bind=self.write_engine, expire_on_commit=False, autoflush=False)
+
+    def _create_missing_indexes(self):
+        """Create indexes added to the schema after a table already existed."""
+        # create_all only emits indexes alongside a new table
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self.write_engine, checkfirst=True)
+
+    def _migrate_data(self):
+        """Run one-time data migrations the database has not had yet."""
+        with self.write_engine.begin() as conn:
+            version = conn.execute(text("PRAGMA user_version")).scalar()
+            if version >= DB_USER_VERSION:
+                return
+            if version < 1:
+                self._compress_legacy_snapshots(conn)
+            conn.execute(text(f"PRAGMA user_version = {DB_USER_VERSION}"))
+
+    def _compress_legacy_snapshots(self, conn):
+        """Convert snapshot payloads stored as plain JSON text to packed bytes.
+
+        Rows that are not valid JSON are left as text.
+        """
+        rows = conn.execute(text(
+            "SELECT id, data_json FROM market_snapshots WHERE typeof(data_json) = 'text'"
+        )).all()
+        updates = []
+        for row in rows:
+            try:
+                updates.append({"id": row.id, "data": pack(loads(row.data_json))})
+            except ValueError as e:
+                logger.warning(f"Leaving market snapshot {row.id} as text: {e}")
+        if updates:
+            conn.execute(text("UPDATE market_snapshots SET data_json = :data WHERE id = :id"), updates)
 
     def get_session(self) -> Session:
-        """Get a database session."""
+        """Get a database session for reads."""
         return self.SessionLocal()
 
+    def get_write_session(self) -> Session:
+        """Get a database session bound to the writer connection."""
+        return self.WriteSessionLocal()
+
     # BotRun operations
     def create_bot_run(self, mode: str, notes: Optional[str] = None) -> BotRun:
         """Create a new bot run."""
-        with self.get_session() as session:
-            bot_run = BotRun(mode=mode, notes=notes, started_at=datetime.utcnow())
+        with self.get_write_session() as session:
+            bot_run = BotRun(mode=mode, notes=notes, started_at=utcnow_naive())
             session.add(bot_run)
             session.commit()
-            session.refresh(bot_run)
             return bot_run
 
     def update_bot_run(self, run_id: int, ended_at: Optional[datetime] = None, notes: Optional[str] = None):
         """Update bot run."""
-        with self.get_session() as session:
-            bot_run = session.query(BotRun).filter(BotRun.id == run_id).first()
-            if bot_run:
-                if ended_at:
-                    bot_run.ended_at = ended_at
-                if notes:
-                    bot_run.notes = notes
-                session.commit()
+        self._update_by_id(BotRun, run_id, {"ended_at": ended_at, "notes": notes})
 
     # MarketSnapshot operations
-    def create_market_snapshot(self, symbol: str, underlying_px: Optional[float], data_json: Optional[str]) -> MarketSnapshot:
-        """Create a market snapshot."""
-        with self.get_session() as session:
-            snapshot = MarketSnapshot(
-                symbol=symbol,
-                underlying_px=underlying_px,
-                data_json=data_json,
-                ts=datetime.utcnow()
-            )
-            session.add(snapshot)
+    def create_market_snapshot(
+        self,
+        symbol: str,
+        underlying_px: Optional[float],
+        data: Any = None,
+        data_json: Optional[str] = None
+    ) -> MarketSnapshot:
+        """Create a market snapshot. ``data`` is stored packed; read it back with json_utils.unpack.
+
+        ``data_json`` (a JSON string) is still accepted from older callers in place of ``data``.
+        """
+        if data_json is not None:
+            data = loads(data_json)
+        # Single INSERT ... RETURNING, bypassing the unit-of-work flush
+        stmt = insert(MarketSnapshot).values(
+            symbol=symbol,
+            underlying_px=underlying_px,
+            data_json=pack(data) if data is not None else None,
+            ts=utcnow_naive()
+        ).returning(MarketSnapshot)
+        with self.get_write_session() as session:
+            snapshot = session.scalar(stmt)
             session.commit()
-            session.refresh(snapshot)
             return snapshot
 
+    def create_market_snapshots_bulk(self, rows: List[Dict]) -> int:
+        """Insert many market snapshots in a single transaction.
+
+        Each row is a dict with ``symbol``, ``underlying_px`` and ``data``, which
+        is packed into ``data_json`` (``ts`` defaults to now). Returns the number
+        of rows inserted.
+        """
+        rows = [
+            {
+                "symbol": row["symbol"],
+                "underlying_px": row.get("underlying_px"),
+                "data_json": pack(row["data"]) if row.get("data") is not None else None,
+                **({"ts": row["ts"]} if "ts" in row else {}),
+            }
+            for row in rows
+        ]
+        return self._insert_bulk(MarketSnapshot, rows)
+
     # Trade operations
     def create_trade(
         self,
@@ -76,10 +199,10 @@ class Repository:
         reason_open: Optional[str] = None
     ) -> Trade:
         """Create a new trade."""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             trade = Trade(
                 bot_run_id=bot_run_id,
-                ts_open=datetime.utcnow(),
+                ts_open=utcnow_naive(),
                 symbol=symbol,
                 exp=exp,
                 short_strike=short_strike,
@@ -91,16 +214,27 @@ class Repository:
             )
             session.add(trade)
             session.commit()
-            session.refresh(trade)
             return trade
 
     def get_open_trades(self, symbol: Optional[str] = None) -> List[Trade]:
         """Get open trades, optionally filtered by symbol."""
+        stmt = select(Trade).where(Trade.status == "open")
+        if symbol:
+            stmt = stmt.where(Trade.symbol == symbol)
+        with self.get_session() as session:
+            return list(session.scalars(stmt))
+
+    def has_open_trade(self, symbol: str) -> bool:
+        """Check for an open trade on a symbol without loading trade rows."""
+        # Answered from the (symbol, status) index alone
+        stmt = select(Trade.id).where(Trade.symbol == symbol, Trade.status == "open").limit(1)
+        with self.get_session() as session:
+            return session.scalar(stmt) is not None
+
+    def get_open_symbols(self) -> Set[str]:
+        """Get the symbols that have an open trade."""
         with self.get_session() as session:
-            query = session.query(Trade).filter(Trade.status == "open")
-            if symbol:
-                query = query.filter(Trade.symbol == symbol)
-            return query.all()
+            return set(session.scalars(select(Trade.symbol).where(Trade.status == "open").distinct()))
 
     def update_trade(
         self,
@@ -111,20 +245,15 @@ class Repository:
         reason_close: Optional[str] = None
     ):
         """Update trade."""
-        with self.get_session() as session:
-            trade = session.query(Trade).filter(Trade.id == trade_id).first()
-            if trade:
-                if status:
-                    trade.status = status
-                if debit_to_close is not None:
-                    trade.debit_to_close = debit_to_close
-                if pnl is not None:
-                    trade.pnl = pnl
-                if reason_close:
-                    trade.reason_close = reason_close
-                if status == "closed":
-                    trade.ts_close = datetime.utcnow()
-                session.commit()
+        values = {
+            "status": status,
+            "debit_to_close": debit_to_close,
+            "pnl": pnl,
+            "reason_close": reason_close,
+        }
+        if status == "closed":
+            values["ts_close"] = utcnow_naive()
+        self._update_by_id(Trade, trade_id, values)
 
     # Order operations
     def create_order(
@@ -138,7 +267,7 @@ class Repository:
         raw_json: Optional[str] = None
     ) -> Order:
         """Create a new order."""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             order = Order(
                 trade_id=trade_id,
                 action=action,
@@ -147,53 +276,74 @@ class Repository:
                 status=status,
                 ib_order_id=ib_order_id,
                 raw_json=raw_json,
-                ts=datetime.utcnow()
+                ts=utcnow_naive()
             )
             session.add(order)
             session.commit()
-            session.refresh(order)
             return order
 
     def update_order(self, order_id: int, status: Optional[str] = None, ib_order_id: Optional[int] = None):
         """Update order."""
-        with self.get_session() as session:
-            order = session.query(Order).filter(Order.id == order_id).first()
-            if order:
-                if status:
-                    order.status = status
-                if ib_order_id:
-                    order.ib_order_id = ib_order_id
-                session.commit()
+        self._update_by_id(Order, order_id, {"status": status, "ib_order_id": ib_order_id})
 
     # Fill operations
     def create_fill(self, order_id: int, price: float, qty: int, raw_json: Optional[str] = None) -> Fill:
         """Create a fill record."""
-        with self.get_session() as session:
-            fill = Fill(
-                order_id=order_id,
-                price=price,
-                qty=qty,
-                raw_json=raw_json,
-                ts=datetime.utcnow()
-            )
-            session.add(fill)
+        # Single INSERT ... RETURNING, bypassing the unit-of-work flush
+        stmt = insert(Fill).values(
+            order_id=order_id,
+            price=price,
+            qty=qty,
+            raw_json=raw_json,
+            ts=utcnow_naive()
+        ).returning(Fill)
+        with self.get_write_session() as session:
+            fill = session.scalar(stmt)
             session.commit()
-            session.refresh(fill)
             return fill
 
+    def create_fills_bulk(self, rows: List[Dict]) -> int:
+        """Insert many fills in a single transaction.
+
+        Each row is a dict with ``order_id``, ``price``, ``qty`` and optionally
+        ``raw_json`` (``ts`` defaults to now). Returns the number of rows inserted.
+        """
+        return self._insert_bulk(Fill, rows)
+
+    def _update_by_id(self, model, row_id: int, values: Dict):
+        """Apply the non-None values to one row with a single UPDATE."""
+        values = {key: value for key, value in values.items() if value is not None}
+        if not values:
+            return
+        with self.get_write_session() as session:
+            session.execute(update(model).where(model.id == row_id).values(**values))
+            session.commit()
+
+    def _insert_bulk(self, model, rows: List[Dict]) -> int:
+        """Insert rows with one executemany and a single commit."""
+        if not rows:
+            return 0
+        ts = utcnow_naive()
+        rows = [{"ts": ts, **row} for row in rows]
+        with self.get_write_session() as session:
+            session.execute(insert(model), rows)
+            session.commit()
+        return len(rows)
+
     # DailyStats operations
     def get_or_create_daily_stats(self, day: date) -> DailyStats:
         """Get or create daily stats for a date."""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             day_dt = datetime.combine(day, datetime.min.time())
-            stats = session.query(DailyStats).filter(
-                func.date(DailyStats.day) == day
-            ).first()
+            # Half-open range on the raw column so the index on day is used
+            stats = session.scalar(select(DailyStats).where(
+                DailyStats.day >= day_dt,
+                DailyStats.day < day_dt + timedelta(days=1)
+            ))
             if not stats:
                 stats = DailyStats(day=day_dt)
                 session.add(stats)
                 session.commit()
-                session.refresh(stats)
             return stats
 
     def update_daily_stats(
@@ -205,23 +355,68 @@ class Repository:
         wins_count: Optional[int] = None,
         losses_count: Optional[int] = None
     ):
-        """Update daily stats."""
-        stats = self.get_or_create_daily_stats(day)
-        with self.get_session() as session:
-            stats = session.query(DailyStats).filter(DailyStats.id == stats.id).first()
-            if stats:
-                if realized_pnl is not None:
-                    stats.realized_pnl = realized_pnl
-                if unrealized_pnl is not None:
-                    stats.unrealized_pnl = unrealized_pnl
-                if trades_count is not None:
-                    stats.trades_count = trades_count
-                if wins_count is not None:
-                    stats.wins_count = wins_count
-                if losses_count is not None:
-                    stats.losses_count = losses_count
-                session.commit()
+        """Update daily stats, creating the row for the day if needed."""
+        values = {
+            "realized_pnl": realized_pnl,
+            "unrealized_pnl": unrealized_pnl,
+            "trades_count": trades_count,
+            "wins_count": wins_count,
+            "losses_count": losses_count,
+        }
+        values = {key: value for key, value in values.items() if value is not None}
+        day_dt = datetime.combine(day, datetime.min.time())
+
+        # Single INSERT ... ON CONFLICT(day) DO UPDATE instead of read-then-write
+        stmt = sqlite_insert(DailyStats).values(day=day_dt, **values)
+        if values:
+            stmt = stmt.on_conflict_do_update(index_elements=["day"], set_=values)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["day"])
+        with self.get_write_session() as session:
+            session.execute(stmt)
+            session.commit()
+
+    def increment_daily_stats(
+        self,
+        day: date,
+        *,
+        realized_pnl_delta: float = 0.0,
+        trades_delta: int = 0,
+        wins_delta: int = 0,
+        losses_delta: int = 0
+    ):
+        """Add to daily stats counters in one statement, creating the row for the day if needed."""
+        deltas = {
+            "realized_pnl": realized_pnl_delta,
+            "trades_count": trades_delta,
+            "wins_count": wins_delta,
+            "losses_count": losses_delta,
+        }
+        deltas = {key: value for key, value in deltas.items() if value}
+        day_dt = datetime.combine(day, datetime.min.time())
+
+        # The database does the add, so concurrent increments cannot lose updates
+        stmt = sqlite_insert(DailyStats).values(day=day_dt, **deltas)
+        if deltas:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day"],
+                set_={key: getattr(DailyStats, key) + stmt.excluded[key] for key in deltas}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["day"])
+        with self.get_write_session() as session:
+            session.execute(stmt)
+            session.commit()
+
+
+@lru_cache(maxsize=1)
+def get_repo() -> Repository:
+    """Get the shared repository, creating the database on first use."""
+    return Repository()
 
 
-# Global repository instance
-repo = Repository()
+def __getattr__(name: str):
+    """Resolve the legacy ``repo`` module attribute lazily."""
+    if name == "repo":
+        return get_repo()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
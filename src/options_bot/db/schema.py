@@ -1,11 +1,12 @@
 """Database schema using SQLAlchemy."""
 
-from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, Float, String, Boolean, DateTime, Text, ForeignKey, Index
+    Column, Integer, Float, String, Boolean, DateTime, Text, ForeignKey, Index, LargeBinary, text
 )
 from sqlalchemy.orm import declarative_base, relationship
 
+from ..time_utils import utcnow_naive
+
 Base = declarative_base()
 
 
@@ -14,7 +15,7 @@ class BotRun(Base):
     __tablename__ = "bot_runs"
 
     id = Column(Integer, primary_key=True)
-    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=False, default=utcnow_naive)
     ended_at = Column(DateTime, nullable=True)
     mode = Column(String(50), nullable=False)  # 'run', 'manage', 'scan'
     notes = Column(Text, nullable=True)
@@ -28,10 +29,10 @@ class MarketSnapshot(Base):
     __tablename__ = "market_snapshots"
 
     id = Column(Integer, primary_key=True)
-    ts = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    ts = Column(DateTime, nullable=False, default=utcnow_naive, index=True)
     symbol = Column(String(20), nullable=False, index=True)
     underlying_px = Column(Float, nullable=True)
-    data_json = Column(Text, nullable=True)  # JSON string of full snapshot
+    data_json = Column(LargeBinary, nullable=True)  # Compressed JSON of full snapshot (json_utils.pack)
 
 
 class Trade(Base):
@@ -60,6 +61,8 @@ class Trade(Base):
 
     __table_args__ = (
         Index("idx_trades_symbol_status", "symbol", "status"),
+        # Partial index for the management loop's status-only lookups
+        Index("idx_trades_open_status", "status", sqlite_where=text("status = 'open'")),
     )
 
 
@@ -69,7 +72,7 @@ class Order(Base):
 
     id = Column(Integer, primary_key=True)
     trade_id = Column(Integer, ForeignKey("trades.id"), nullable=True)
-    ts = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    ts = Column(DateTime, nullable=False, default=utcnow_naive, index=True)
     action = Column(String(20), nullable=False)  # 'open', 'close'
     order_type = Column(String(20), nullable=False)  # 'limit', 'market'
     limit_price = Column(Float, nullable=True)
@@ -81,6 +84,10 @@ class Order(Base):
     trade = relationship("Trade", back_populates="orders")
     fills = relationship("Fill", back_populates="order")
 
+    __table_args__ = (
+        Index("idx_orders_trade_status", "trade_id", "status"),
+    )
+
 
 class Fill(Base):
     """Fill record."""
@@ -88,7 +95,7 @@ class Fill(Base):
 
     id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
-    ts = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    ts = Column(DateTime, nullable=False, default=utcnow_naive, index=True)
     price = Column(Float, nullable=False)
     qty = Column(Integer, nullable=False)
     raw_json = Column(Text, nullable=True)  # JSON string of full fill
@@ -1,17 +1,32 @@
 """BAG combo order creation and execution."""
 
 import time
-import json
-from typing import Optional, Dict
-from ib_insync import LimitOrder, ComboLeg, Contract, Order, Stock, Option
+from typing import Dict, List, Optional
+from ib_insync import ComboLeg, Contract, LimitOrder, Trade
 
 from ..config import config
+from ..json_utils import dumps
 from ..logging_setup import get_logger
-from ..db.repo import repo
-from .connection import ib_conn
+from ..db.repo import get_repo
+from .connection import get_ib_conn
+from .market_data import get_option_contract
 
 logger = get_logger(__name__)
 
+# IB order statuses after which an order will not change again
+TERMINAL_ORDER_STATUSES = {"Filled", "Cancelled", "ApiCancelled", "Inactive"}
+
+
+def _qualify_options(symbol: str, expiration: str, strikes: List[float], right: str) -> List[int]:
+    """Return option conIds, qualifying legs not yet qualified on this connection in one IB request."""
+    # Shared contract objects, so legs qualified elsewhere (e.g. when quoting) are reused
+    options = [get_option_contract(symbol, expiration, strike, right) for strike in strikes]
+    get_ib_conn().qualify_contracts(*options)
+    for option in options:
+        if not option.conId:
+            raise ValueError(f"Could not qualify option {symbol} {expiration} {option.strike} {right}")
+    return [option.conId for option in options]
+
 
 def create_combo_order(
     symbol: str,
@@ -24,15 +39,8 @@ def create_combo_order(
 ) -> Optional[Contract]:
     """Create a BAG combo order contract for put credit spread."""
     try:
-        # Create underlying stock contract
-        stock = Stock(symbol, "SMART", "USD")
-        ib_conn.ib.qualifyContracts(stock)
-
-        # Create option contracts
-        short_put = Option(symbol, expiration, short_strike, "P", "SMART")
-        long_put = Option(symbol, expiration, long_strike, "P", "SMART")
-
-        ib_conn.ib.qualifyContracts(short_put, long_put)
+        # Resolve both option legs (qualified once per connection)
+        short_con_id, long_con_id = _qualify_options(symbol, expiration, [short_strike, long_strike], "P")
 
         # Create combo contract (BAG)
         combo = Contract()
@@ -46,14 +54,14 @@ def create_combo_order(
         if action == "SELL":
             # Opening: sell short put, buy long put
             combo.comboLegs = [
-                ComboLeg(conId=short_put.conId, ratio=1, action="SELL", exchange="SMART"),
-                ComboLeg(conId=long_put.conId, ratio=1, action="BUY", exchange="SMART"),
+                ComboLeg(conId=short_con_id, ratio=1, action="SELL", exchange="SMART"),
+                ComboLeg(conId=long_con_id, ratio=1, action="BUY", exchange="SMART"),
             ]
         else:
             # Closing: buy short put, sell long put
             combo.comboLegs = [
-                ComboLeg(conId=short_put.conId, ratio=1, action="BUY", exchange="SMART"),
-                ComboLeg(conId=long_put.conId, ratio=1, action="SELL", exchange="SMART"),
+                ComboLeg(conId=short_con_id, ratio=1, action="BUY", exchange="SMART"),
+                ComboLeg(conId=long_con_id, ratio=1, action="SELL", exchange="SMART"),
             ]
 
         return combo
@@ -67,9 +75,9 @@ def place_combo_order(
     quantity: int,
     limit_price: float,
     action: str
-) -> Optional[Order]:
-    """Place a combo limit order."""
-    if not ib_conn.is_connected():
+) -> Optional[Trade]:
+    """Place a combo limit order. Returns the live ib_insync Trade."""
+    if not get_ib_conn().is_connected():
         logger.error("Not connected to IB")
         return None
 
@@ -83,18 +91,18 @@ def place_combo_order(
         order.tif = "DAY"  # Day order
 
         # Place order
-        trade = ib_conn.ib.placeOrder(combo, order)
+        trade = get_ib_conn().ib.placeOrder(combo, order)
         logger.info(f"Placed {action} order for {quantity} contracts at {limit_price}")
 
         # Store order in database
-        repo.create_order(
+        get_repo().create_order(
             trade_id=None,  # Will be updated when trade is created
             action=action.lower(),
             order_type="limit",
             limit_price=limit_price,
             status="submitted",
             ib_order_id=trade.order.orderId if trade.order else None,
-            raw_json=json.dumps({
+            raw_json=dumps({
                 "symbol": combo.symbol,
                 "quantity": quantity,
                 "limit_price": limit_price,
@@ -102,12 +110,24 @@ def place_combo_order(
             })
         )
 
-        return trade.order
+        return trade
     except Exception as e:
         logger.error(f"Error placing combo order: {e}")
         return None
 
 
+def wait_for_order(trade: Trade, timeout: float) -> str:
+    """Wait for order status updates until terminal or timeout. Returns the status."""
+    ib = get_ib_conn().ib
+    deadline = time.monotonic() + timeout
+    while trade.orderStatus.status not in TERMINAL_ORDER_STATUSES:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        ib.waitOnUpdate(timeout=min(0.5, remaining))
+    return trade.orderStatus.status
+
+
 def place_spread_order_open(
     symbol: str,
     expiration: str,
@@ -116,7 +136,11 @@ def place_spread_order_open(
     quantity: int,
     target_credit: float
 ) -> Optional[Dict]:
-    """Place order to open a put credit spread with retry logic."""
+    """Place order to open a put credit spread with retry logic.
+
+    Reprices only after the previous order is confirmed done with nothing
+    filled. The result's ``quantity`` is what actually filled.
+    """
     if config.trading_disabled:
         logger.warning("Trading is disabled - order not placed")
         return None
@@ -126,12 +150,19 @@ def place_spread_order_open(
     if not combo:
         return None
 
-    # Try placing order with price adjustments
+    # Try placing order with price adjustments; every wait, including after a
+    # cancel, comes out of one ENTRY_RETRY_SECONDS budget
     max_attempts = 5
     price_adjustment = 0.0
     max_adjustment = config.entry_max_slippage
+    attempt_timeout = config.entry_retry_seconds / max_attempts
+    deadline = time.monotonic() + config.entry_retry_seconds
 
     for attempt in range(max_attempts):
+        if deadline - time.monotonic() <= 0:
+            logger.warning("Entry retry window elapsed")
+            break
+
         limit_price = target_credit - price_adjustment
         if limit_price <= 0:
             logger.warning(f"Limit price too low: {limit_price}")
@@ -139,20 +170,39 @@ def place_spread_order_open(
 
         logger.info(f"Attempt {attempt + 1}: placing order at {limit_price} (target: {target_credit})")
 
-        order = place_combo_order(combo, quantity, limit_price, "SELL")
-        if order:
-            # Wait for fill or timeout
-            trade = ib_conn.ib.reqAllOpenOrders()
-            # Check if order filled (simplified - in production, monitor order status)
-            time.sleep(2)  # Give it a moment
-
-            # Return order info
-            return {
-                "order": order,
-                "combo": combo,
-                "limit_price": limit_price,
-                "quantity": quantity
-            }
+        trade = place_combo_order(combo, quantity, limit_price, "SELL")
+        if trade:
+            # Driven by IB order events rather than a fixed sleep
+            status = wait_for_order(trade, min(attempt_timeout, deadline - time.monotonic()))
+            if status not in TERMINAL_ORDER_STATUSES:
+                # Cancel before repricing; it may still fill while cancelling
+                get_ib_conn().ib.cancelOrder(trade.order)
+                status = wait_for_order(trade, min(attempt_timeout, deadline - time.monotonic()))
+
+            if status == "Filled":
+                return {
+                    "order": trade.order,
+                    "combo": combo,
+                    "limit_price": limit_price,
+                    "quantity": quantity
+                }
+
+            if status not in TERMINAL_ORDER_STATUSES:
+                # Cancel not confirmed: the order may still be live, so a new one could double the position
+                logger.error(f"Order {trade.order.orderId} still {status} after cancel; not repricing")
+                return None
+
+            filled = int(trade.orderStatus.filled)
+            if filled > 0:
+                # Keep the partial position rather than reopening the full size
+                logger.warning(f"Order partially filled at {limit_price}: {filled}/{quantity} contracts")
+                return {
+                    "order": trade.order,
+                    "combo": combo,
+                    "limit_price": limit_price,
+                    "quantity": filled
+                }
+            logger.info(f"Order not filled at {limit_price} (status: {status})")
 
         # Adjust price for next attempt
         price_adjustment += 0.01
@@ -160,8 +210,6 @@ def place_spread_order_open(
             logger.warning(f"Max slippage exceeded, cancelling order")
             break
 
-        time.sleep(1)
-
     logger.error("Failed to place order after all attempts")
     return None
 
@@ -185,10 +233,10 @@ def place_spread_order_close(
         return None
 
     # Place order
-    order = place_combo_order(combo, quantity, target_debit, "BUY")
-    if order:
+    trade = place_combo_order(combo, quantity, target_debit, "BUY")
+    if trade:
         return {
-            "order": order,
+            "order": trade.order,
             "combo": combo,
             "limit_price": target_debit,
             "quantity": quantity
@@ -1,22 +1,30 @@
 """IBKR connection management with retries."""
 
 import time
-from typing import Optional
-from ib_insync import IB, util
+from functools import lru_cache
+from typing import List, Optional
+from ib_insync import IB, Contract
 
 from ..config import config
 from ..logging_setup import get_logger
 
 logger = get_logger(__name__)
 
+# How long a successful or failed health check result is reused
+HEALTH_CHECK_TTL_SECONDS = 1.0
 
 class IBConnection:
     """Manages IBKR connection."""
 
+    __slots__ = ("ib", "connected", "_last_health_check_ts", "_last_health_check_ok", "_qualified")
+
     def __init__(self):
         """Initialize connection."""
         self.ib = IB()
         self.connected = False
+        self._last_health_check_ts = 0.0
+        self._last_health_check_ok = False
+        self._qualified: set[int] = set()  # conIds qualified during this connection
 
     def connect(self, retries: int = 3, retry_delay: float = 2.0) -> bool:
         """Connect to IB Gateway with retries."""
@@ -30,6 +38,7 @@ class IBConnection:
                     readonly=config.ib_readonly
                 )
                 self.connected = True
+                self._last_health_check_ts = 0.0
                 logger.info("Successfully connected to IB Gateway")
                 return True
             except Exception as e:
@@ -47,21 +56,49 @@ class IBConnection:
             try:
                 self.ib.disconnect()
                 self.connected = False
+                self._last_health_check_ts = 0.0
+                self._qualified.clear()
                 logger.info("Disconnected from IB Gateway")
             except Exception as e:
                 logger.error(f"Error disconnecting: {e}")
 
     def is_connected(self) -> bool:
-        """Check if connected."""
+        """Check if connected. The health check result is cached briefly."""
         if not self.connected:
             return False
+        now = time.monotonic()
+        if now - self._last_health_check_ts < HEALTH_CHECK_TTL_SECONDS:
+            return self._last_health_check_ok
         try:
             # Try to get account values as a health check
             self.ib.accountValues()
-            return True
+            ok = True
         except Exception:
             self.connected = False
-            return False
+            ok = False
+        self._last_health_check_ts = now
+        self._last_health_check_ok = ok
+        return ok
+
+    def _unqualified(self, contracts: tuple[Contract, ...]) -> List[Contract]:
+        """Contracts not yet qualified on this connection."""
+        return [c for c in contracts if c.conId not in self._qualified]
+
+    def qualify_contracts(self, *contracts: Contract) -> List[Contract]:
+        """Qualify contracts, skipping ones already qualified on this connection."""
+        pending = self._unqualified(contracts)
+        if pending:
+            self.ib.qualifyContracts(*pending)
+            self._qualified.update(c.conId for c in pending if c.conId)
+        return [c for c in contracts if c.conId]
+
+    async def qualify_contracts_async(self, *contracts: Contract) -> List[Contract]:
+        """Async variant of qualify_contracts."""
+        pending = self._unqualified(contracts)
+        if pending:
+            await self.ib.qualifyContractsAsync(*pending)
+            self._qualified.update(c.conId for c in pending if c.conId)
+        return [c for c in contracts if c.conId]
 
     def get_accounts(self) -> list[str]:
         """Get list of account IDs."""
@@ -120,5 +157,14 @@ class IBConnection:
             return {}
 
 
-# Global connection instance
-ib_conn = IBConnection()
+@lru_cache(maxsize=1)
+def get_ib_conn() -> IBConnection:
+    """Get the shared IB connection, creating it on first use."""
+    return IBConnection()
+
+
+def __getattr__(name: str):
+    """Resolve the legacy ``ib_conn`` module attribute lazily."""
+    if name == "ib_conn":
+        return get_ib_conn()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
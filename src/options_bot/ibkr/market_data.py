@@ -1,30 +1,38 @@
 """Market data retrieval."""
 
+import asyncio
+import math
+import time
+from functools import lru_cache
 from typing import Optional
 from ib_insync import Stock, Option, Contract
 from ib_insync.ticker import Ticker
 
 from ..config import config
 from ..logging_setup import get_logger
-from .connection import ib_conn
+from .connection import get_ib_conn
 
 logger = get_logger(__name__)
 
+# Polling interval while waiting for ticks to arrive
+TICK_POLL_INTERVAL = 0.05
 
+
+@lru_cache(maxsize=256)
 def get_stock_contract(symbol: str) -> Stock:
-    """Get stock contract for symbol."""
+    """Get stock contract for symbol, shared so qualification sticks."""
     contract = Stock(symbol, "SMART", "USD")
     return contract
 
 
+@lru_cache(maxsize=4096)
 def get_option_contract(
     symbol: str,
     expiration: str,
     strike: float,
     right: str
 ) -> Option:
-    """Get option contract."""
-    stock = get_stock_contract(symbol)
+    """Get option contract, shared so qualification sticks."""
     contract = Option(
         symbol,
         expiration,
@@ -35,16 +43,63 @@ def get_option_contract(
     return contract
 
 
+def _is_number(value) -> bool:
+    """Check a tick value is populated (ib_insync uses NaN for missing)."""
+    return value is not None and not math.isnan(value)
+
+
+def tick_value(value) -> Optional[float]:
+    """Return a tick field, or None when it is unset (None or NaN)."""
+    return value if _is_number(value) else None
+
+
+def _ticker_ready(ticker: Ticker) -> bool:
+    """Check a ticker has bid/ask, plus Greeks for options when required."""
+    if not (_is_number(ticker.bid) and _is_number(ticker.ask)):
+        return False
+    if config.require_greeks and ticker.contract is not None and ticker.contract.secType == "OPT":
+        return ticker.modelGreeks is not None
+    return True
+
+
+async def get_ticker_async(contract: Contract, timeout: float = 2.0) -> Ticker:
+    """Get ticker for contract, returning as soon as its fields populate.
+
+    Uses a snapshot request, which IB ends on its own, so no streaming
+    market data line is held and nothing needs cancelling. Returns once the
+    quote is ready, IB reports the snapshot complete, or ``timeout`` passes,
+    with whatever arrived by then.
+    """
+    ib = get_ib_conn().ib
+    stale = ib.ticker(contract)
+    if stale is not None:
+        # ib_insync hands back the same Ticker for a shared contract, still holding
+        # the previous request's quote; clear it so only fresh ticks count as ready.
+        # No tick can land before the first await below.
+        stale.bid = stale.ask = math.nan
+        stale.modelGreeks = None
+    # Completes on IB's snapshot-end message, e.g. for an option without Greeks
+    snapshot = asyncio.ensure_future(ib.reqTickersAsync(contract))
+    await asyncio.sleep(0)  # let the request go out and register the ticker
+    ticker = ib.ticker(contract)
+    deadline = time.monotonic() + timeout
+    while not snapshot.done() and not _ticker_ready(ticker) and time.monotonic() < deadline:
+        await asyncio.sleep(TICK_POLL_INTERVAL)
+    if snapshot.done():
+        snapshot.result()  # surface a failed request to the caller
+    else:
+        snapshot.cancel()
+    return ticker
+
+
 def get_ticker(contract: Contract) -> Optional[Ticker]:
     """Get ticker for contract."""
-    if not ib_conn.is_connected():
+    if not get_ib_conn().is_connected():
         logger.error("Not connected to IB")
         return None
 
     try:
-        ticker = ib_conn.ib.reqMktData(contract, "", False, False)
-        ib_conn.ib.sleep(1)  # Wait for data
-        return ticker
+        return get_ib_conn().ib.run(get_ticker_async(contract))
     except Exception as e:
         logger.error(f"Error getting ticker for {contract}: {e}")
         return None
@@ -57,13 +112,32 @@ def get_stock_quote(symbol: str) -> Optional[dict]:
     if not ticker:
         return None
 
+    return _stock_quote_from_ticker(symbol, ticker)
+
+
+async def get_stock_quote_async(symbol: str) -> Optional[dict]:
+    """Get stock quote with bid/ask without blocking the event loop."""
+    contract = get_stock_contract(symbol)
+    try:
+        ticker = await get_ticker_async(contract)
+    except Exception as e:
+        logger.error(f"Error getting ticker for {contract}: {e}")
+        return None
+
+    return _stock_quote_from_ticker(symbol, ticker)
+
+
+def _stock_quote_from_ticker(symbol: str, ticker: Ticker) -> dict:
+    """Build the stock quote dict from a ticker."""
+    bid = tick_value(ticker.bid)
+    ask = tick_value(ticker.ask)
     return {
         "symbol": symbol,
-        "bid": ticker.bid if ticker.bid else None,
-        "ask": ticker.ask if ticker.ask else None,
-        "last": ticker.last if ticker.last else None,
-        "close": ticker.close if ticker.close else None,
-        "has_bid_ask": ticker.bid is not None and ticker.ask is not None,
+        "bid": bid,
+        "ask": ask,
+        "last": tick_value(ticker.last),
+        "close": tick_value(ticker.close),
+        "has_bid_ask": bid is not None and ask is not None,
     }
 
 
@@ -80,24 +154,20 @@ def get_option_quote(
         return None
 
     # Get Greeks from ticker
-    delta = None
-    has_greeks = False
-    if hasattr(ticker, 'modelGreeks') and ticker.modelGreeks:
-        delta = ticker.modelGreeks.delta
-        has_greeks = True
-    elif hasattr(ticker, 'optionGreeks') and ticker.optionGreeks:
-        delta = ticker.optionGreeks.delta
-        has_greeks = True
+    greeks = ticker.modelGreeks
+    delta = tick_value(greeks.delta) if greeks else None
+    bid = tick_value(ticker.bid)
+    ask = tick_value(ticker.ask)
 
     return {
         "symbol": symbol,
         "expiration": expiration,
         "strike": strike,
         "right": right,
-        "bid": ticker.bid if ticker.bid else None,
-        "ask": ticker.ask if ticker.ask else None,
-        "last": ticker.last if ticker.last else None,
+        "bid": bid,
+        "ask": ask,
+        "last": tick_value(ticker.last),
         "delta": delta,
-        "has_greeks": has_greeks,
-        "has_bid_ask": ticker.bid is not None and ticker.ask is not None,
+        "has_greeks": greeks is not None,
+        "has_bid_ask": bid is not None and ask is not None,
     }
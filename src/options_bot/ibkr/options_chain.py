@@ -1,18 +1,30 @@
 """Options chain retrieval and filtering."""
 
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+import os
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
 from ib_insync import Stock, Option, Contract
 from ib_insync.ticker import Ticker
 
 from ..config import config
+from ..json_utils import dumps, loads
 from ..logging_setup import get_logger
-from ..time_utils import days_to_expiration
-from .connection import ib_conn
-from .market_data import get_stock_contract, get_ticker
+from ..time_utils import now_et
+from .connection import get_ib_conn
+from .market_data import get_option_contract, get_stock_contract, get_ticker, tick_value
 
 logger = get_logger(__name__)
 
+# Contracts per reqTickers batch, kept under IB's simultaneous market data limit
+QUOTE_BATCH_SIZE = 50
+
+# Option chains by symbol with the ET date they were fetched; chains change at most daily
+_chain_cache: Dict[str, Tuple[date, "OptionChain"]] = {}
+
 
 class OptionChain:
     """Represents an option chain for a symbol."""
@@ -21,21 +33,71 @@ class OptionChain:
         """Initialize option chain."""
         self.symbol = symbol
         self.expirations = expirations
-        self.strikes = strikes  # expiration -> list of strikes
+        # expiration -> sorted float64 array of strikes
+        self.strikes = {exp: np.asarray(exp_strikes, dtype=np.float64) for exp, exp_strikes in strikes.items()}
+
+    def nearest_strike(self, expiration: str, price: float) -> Optional[float]:
+        """Get the strike closest to price for an expiration."""
+        strikes = self.strikes.get(expiration)
+        if strikes is None or not strikes.size:
+            return None
+        idx = int(np.searchsorted(strikes, price))
+        if idx == len(strikes) or (idx > 0 and price - strikes[idx - 1] <= strikes[idx] - price):
+            idx -= 1
+        return float(strikes[idx])
 
 
-def get_option_chain(symbol: str) -> Optional[OptionChain]:
-    """Get option chain for symbol."""
-    if not ib_conn.is_connected():
-        logger.error("Not connected to IB")
+def _chain_cache_path(symbol: str, day: date) -> Path:
+    """Path of the persisted chain for a symbol and trading day."""
+    return Path(config.cache_dir) / "options_data" / symbol / day.strftime("%Y%m%d") / "chain.json"
+
+
+def _load_cached_chain(symbol: str, day: date) -> Optional[OptionChain]:
+    """Load a chain persisted for the trading day, if any."""
+    path = _chain_cache_path(symbol, day)
+    try:
+        data = loads(path.read_bytes())
+        return OptionChain(symbol, data["expirations"], data["strikes"])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable chain cache {path}: {e}")
         return None
 
+
+def _save_cached_chain(chain: OptionChain, day: date):
+    """Persist a chain for warm restarts later in the trading day."""
+    path = _chain_cache_path(chain.symbol, day)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        strikes = {exp: exp_strikes.tolist() for exp, exp_strikes in chain.strikes.items()}
+        tmp_path.write_text(dumps({"expirations": chain.expirations, "strikes": strikes}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write chain cache {path}: {e}")
+
+
+async def get_option_chain_async(symbol: str) -> Optional[OptionChain]:
+    """Get option chain for symbol without blocking the event loop."""
+    today = now_et().date()
+    cached = _chain_cache.get(symbol)
+    if cached and cached[0] == today:
+        return cached[1]
+
+    # Warm start from a chain saved earlier today by this or another process
+    option_chain = _load_cached_chain(symbol, today)
+    if option_chain:
+        _chain_cache[symbol] = (today, option_chain)
+        return option_chain
+
     try:
+        ib = get_ib_conn().ib
         stock = get_stock_contract(symbol)
-        ib_conn.ib.qualifyContracts(stock)
+        await get_ib_conn().qualify_contracts_async(stock)
 
         # Request option chain
-        chains = ib_conn.ib.reqSecDefOptParams(
+        chains = await ib.reqSecDefOptParamsAsync(
             stock.symbol,
             "",
             stock.secType,
@@ -52,12 +114,24 @@ def get_option_chain(symbol: str) -> Optional[OptionChain]:
         strikes = {exp: sorted(chain.strikes) for exp in expirations}
 
         logger.info(f"Found {len(expirations)} expirations for {symbol}")
-        return OptionChain(symbol, expirations, strikes)
+        option_chain = OptionChain(symbol, expirations, strikes)
+        _chain_cache[symbol] = (today, option_chain)
+        _save_cached_chain(option_chain, today)
+        return option_chain
     except Exception as e:
         logger.error(f"Error getting option chain for {symbol}: {e}")
         return None
 
 
+def get_option_chain(symbol: str) -> Optional[OptionChain]:
+    """Get option chain for symbol."""
+    if not get_ib_conn().is_connected():
+        logger.error("Not connected to IB")
+        return None
+
+    return get_ib_conn().ib.run(get_option_chain_async(symbol))
+
+
 def get_option_contract_with_greeks(
     symbol: str,
     expiration: str,
@@ -66,66 +140,157 @@ def get_option_contract_with_greeks(
 ) -> Optional[Dict]:
     """Get option contract with market data and Greeks."""
     try:
-        stock = get_stock_contract(symbol)
-        option = Option(
-            symbol,
-            expiration,
-            strike,
-            right,
-            "SMART"
-        )
-        ib_conn.ib.qualifyContracts(option)
+        option = get_option_contract(symbol, expiration, strike, right)
+        get_ib_conn().qualify_contracts(option)
 
         # Request market data
         ticker = get_ticker(option)
         if not ticker:
             return None
 
-        # Extract Greeks from ticker
-        delta = None
-        has_greeks = False
-        if hasattr(ticker, 'modelGreeks') and ticker.modelGreeks:
-            delta = ticker.modelGreeks.delta
-            has_greeks = True
-        elif hasattr(ticker, 'optionGreeks') and ticker.optionGreeks:
-            delta = ticker.optionGreeks.delta
-            has_greeks = True
-
-        bid = ticker.bid if ticker.bid else None
-        ask = ticker.ask if ticker.ask else None
-        bid_ask_spread = None
-        if bid is not None and ask is not None:
-            bid_ask_spread = ask - bid
-
-        return {
-            "contract": option,
-            "symbol": symbol,
-            "expiration": expiration,
-            "strike": strike,
-            "right": right,
-            "bid": bid,
-            "ask": ask,
-            "bid_ask_spread": bid_ask_spread,
-            "delta": delta,
-            "has_greeks": has_greeks,
-            "has_bid_ask": bid is not None and ask is not None,
-        }
+        return _option_quote_from_ticker(option, ticker)
     except Exception as e:
         logger.error(f"Error getting option with Greeks for {symbol} {expiration} {strike} {right}: {e}")
         return None
 
 
+def _option_quote_from_ticker(option: Option, ticker: Ticker) -> Dict:
+    """Build the option quote dict from a ticker."""
+    # Extract Greeks from ticker
+    greeks = ticker.modelGreeks
+    delta = tick_value(greeks.delta) if greeks else None
+    has_greeks = greeks is not None
+
+    bid = tick_value(ticker.bid)
+    ask = tick_value(ticker.ask)
+    bid_ask_spread = None
+    if bid is not None and ask is not None:
+        bid_ask_spread = ask - bid
+
+    return {
+        "contract": option,
+        "symbol": option.symbol,
+        "expiration": option.lastTradeDateOrContractMonth,
+        "strike": option.strike,
+        "right": option.right,
+        "bid": bid,
+        "ask": ask,
+        "bid_ask_spread": bid_ask_spread,
+        "delta": delta,
+        "has_greeks": has_greeks,
+        "has_bid_ask": bid is not None and ask is not None,
+    }
+
+
+async def get_option_quotes_multi_async(
+    requests: List[Tuple[str, str, float, str]]
+) -> List[Optional[Dict]]:
+    """Get quotes and Greeks for many (symbol, expiration, strike, right) options at once.
+
+    Contracts are qualified together and quoted with concurrent snapshot
+    requests. Results line up with ``requests``; options that cannot be
+    qualified or quoted are None.
+    """
+    ib = get_ib_conn().ib
+    options = [get_option_contract(symbol, exp, strike, right) for symbol, exp, strike, right in requests]
+    await get_ib_conn().qualify_contracts_async(*options)
+
+    # Quote each distinct contract once even if requested repeatedly
+    qualified = list({option.conId: option for option in options if option.conId}.values())
+    tickers_by_con_id = {}
+    for i in range(0, len(qualified), QUOTE_BATCH_SIZE):
+        tickers = await ib.reqTickersAsync(*qualified[i:i + QUOTE_BATCH_SIZE])
+        tickers_by_con_id.update((ticker.contract.conId, ticker) for ticker in tickers)
+
+    results = []
+    for option in options:
+        ticker = tickers_by_con_id.get(option.conId) if option.conId else None
+        results.append(_option_quote_from_ticker(option, ticker) if ticker else None)
+    return results
+
+
+def get_option_quotes_multi(requests: List[Tuple[str, str, float, str]]) -> List[Optional[Dict]]:
+    """Blocking wrapper around get_option_quotes_multi_async."""
+    if not get_ib_conn().is_connected():
+        logger.error("Not connected to IB")
+        return [None] * len(requests)
+
+    try:
+        return get_ib_conn().ib.run(get_option_quotes_multi_async(requests))
+    except Exception as e:
+        logger.error(f"Error getting option quotes: {e}")
+        return [None] * len(requests)
+
+
+async def get_option_quotes_batch_async(
+    symbol: str,
+    requests: List[Tuple[str, float, str]]
+) -> List[Optional[Dict]]:
+    """Get quotes and Greeks for many (expiration, strike, right) options of one symbol."""
+    return await get_option_quotes_multi_async([(symbol, exp, strike, right) for exp, strike, right in requests])
+
+
+def get_option_quotes_batch(
+    symbol: str,
+    requests: List[Tuple[str, float, str]]
+) -> List[Optional[Dict]]:
+    """Blocking wrapper around get_option_quotes_batch_async."""
+    if not get_ib_conn().is_connected():
+        logger.error("Not connected to IB")
+        return [None] * len(requests)
+
+    try:
+        return get_ib_conn().ib.run(get_option_quotes_batch_async(symbol, requests))
+    except Exception as e:
+        logger.error(f"Error getting option quotes for {symbol}: {e}")
+        return [None] * len(requests)
+
+
+async def get_option_chain_snapshot_async(
+    symbol: str,
+    expiration: str,
+    strikes: List[float],
+    right: str
+) -> Dict[float, Dict]:
+    """Quote every strike of one expiration in a single batch.
+
+    Returns quotes keyed by strike; strikes that could not be quoted are absent.
+    """
+    quotes = await get_option_quotes_batch_async(symbol, [(expiration, strike, right) for strike in strikes])
+    return {strike: quote for strike, quote in zip(strikes, quotes) if quote is not None}
+
+
 def filter_expirations_by_dte(expirations: List[str], dte_min: int, dte_max: int) -> List[str]:
     """Filter expirations by days to expiration."""
-    from ..time_utils import now_et
-    now = now_et()
-    filtered = []
-    for exp_str in expirations:
-        try:
-            exp_date = datetime.strptime(exp_str, "%Y%m%d")
-            dte = days_to_expiration(exp_date, now)
-            if dte_min <= dte <= dte_max:
-                filtered.append(exp_str)
-        except ValueError:
-            logger.warning(f"Invalid expiration format: {exp_str}")
-    return filtered
+    return list(_filter_expirations_by_dte(tuple(expirations), dte_min, dte_max, now_et().date()))
+
+
+@lru_cache(maxsize=64)
+def _filter_expirations_by_dte(
+    expirations: Tuple[str, ...],
+    dte_min: int,
+    dte_max: int,
+    today: date
+) -> Tuple[str, ...]:
+    """Filter expirations by days to expiration as of ``today``."""
+    well_formed = [exp_str for exp_str in expirations if len(exp_str) == 8 and exp_str.isdigit()]
+
+    # Parse YYYYMMDD in one pass: year + month offset + day offset
+    ymd = np.array(well_formed, dtype=np.int64)
+    month = ymd // 100 % 100
+    day = ymd % 100
+    months = (ymd // 10000 - 1970).astype("datetime64[Y]") + (month - 1).astype("timedelta64[M]")
+    exp_dates = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    # An out-of-range day rolls over into the following month
+    valid = (month >= 1) & (month <= 12) & (day >= 1) & (exp_dates.astype("datetime64[M]") == months)
+
+    dte = (exp_dates - np.datetime64(today, "D")).astype(np.int64)
+    in_range = valid & (dte >= dte_min) & (dte <= dte_max)
+
+    if len(well_formed) < len(expirations) or not valid.all():
+        valid_set = {well_formed[i] for i in np.flatnonzero(valid)}
+        for exp_str in expirations:
+            if exp_str not in valid_set:
+                logger.warning(f"Invalid expiration format: {exp_str}")
+
+    return tuple(well_formed[i] for i in np.flatnonzero(in_range))
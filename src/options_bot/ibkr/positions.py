@@ -5,18 +5,18 @@ from ib_insync import Portfolio, Position
 
 from ..config import config
 from ..logging_setup import get_logger
-from .connection import ib_conn
+from .connection import get_ib_conn
 
 logger = get_logger(__name__)
 
 
 def get_open_positions() -> List[Position]:
     """Get all open positions."""
-    if not ib_conn.is_connected():
+    if not get_ib_conn().is_connected():
         return []
 
     try:
-        positions = ib_conn.ib.positions()
+        positions = get_ib_conn().ib.positions()
         return positions
     except Exception as e:
         logger.error(f"Error getting positions: {e}")
@@ -0,0 +1,31 @@
+"""Fast JSON serialization helpers."""
+
+import zlib
+from typing import Any, Optional
+
+import orjson
+
+# Favour speed over ratio; snapshot payloads are written on the scan path
+COMPRESSION_LEVEL = 3
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an object to a JSON string."""
+    return orjson.dumps(obj).decode()
+
+
+def loads(data: str | bytes) -> Any:
+    """Deserialize a JSON string or bytes."""
+    return orjson.loads(data)
+
+
+def pack(obj: Any) -> bytes:
+    """Serialize an object to compressed JSON bytes for BLOB storage."""
+    return zlib.compress(orjson.dumps(obj), COMPRESSION_LEVEL)
+
+
+def unpack(data: Optional[bytes]) -> Any:
+    """Deserialize bytes produced by pack()."""
+    if data is None:
+        return None
+    return orjson.loads(zlib.decompress(data))
@@ -1,15 +1,50 @@
 """Logging configuration with rotating file handler."""
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 from .config import config
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Background listener writing queued records to the console and file handlers
+_listener: Optional[QueueListener] = None
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def setup_logging() -> None:
-    """Configure logging with rotating file handler."""
+    """Configure logging with rotating file handler.
+
+    The calling thread still builds and formats each record
+    (QueueHandler.prepare merges the message and args); only the
+    console and file I/O is handed off to a background QueueListener
+    thread.
+    """
+    global _listener
+    _stop_listener()
+
+    # The log format uses none of these, so skip collecting them per record.
+    # These are process-wide logging module flags, not per-handler settings.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     # Create log directory if it doesn't exist
     log_dir = Path(config.log_dir)
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -21,15 +56,12 @@ def setup_logging() -> None:
     # Remove existing handlers
     root_logger.handlers.clear()
 
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT, style="%")
+
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    console_handler.setFormatter(formatter)
 
     # Rotating file handler
     log_file = log_dir / "bot.log"
@@ -40,12 +72,13 @@ def setup_logging() -> None:
         encoding="utf-8"
     )
     file_handler.setLevel(logging.INFO)
-    file_formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    file_handler.setFormatter(formatter)
+
+    # Root logger only enqueues; the listener owns the real handlers
+    log_queue: queue.Queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
 
     # Set specific logger levels
     logging.getLogger("ib_insync").setLevel(logging.WARNING)
@@ -5,7 +5,7 @@ from typing import Dict, Optional
 
 from ..config import config
 from ..logging_setup import setup_logging, get_logger
-from ..ibkr.connection import ib_conn
+from ..ibkr.connection import get_ib_conn
 from ..ibkr.market_data import get_stock_quote, get_option_quote
 from ..ibkr.options_chain import get_option_chain
 
@@ -31,7 +31,7 @@ def run_doctor():
     print("\n" + "=" * 60)
     print("1. IB Gateway Connection")
     print("=" * 60)
-    if ib_conn.connect():
+    if get_ib_conn().connect():
         results["connection"] = True
         print("✓ Connected to IB Gateway")
     else:
@@ -49,11 +49,11 @@ def run_doctor():
         print("\n" + "=" * 60)
         print("2. Account Verification")
         print("=" * 60)
-        account_id = ib_conn.get_account_id()
+        account_id = get_ib_conn().get_account_id()
         if account_id:
             results["account_id"] = account_id
             print(f"✓ Account ID: {account_id}")
-            is_paper = ib_conn.is_paper_account(account_id)
+            is_paper = get_ib_conn().is_paper_account(account_id)
             results["is_paper"] = is_paper
             if is_paper:
                 print("✓ Paper account detected (DU prefix)")
@@ -106,24 +106,19 @@ def run_doctor():
         if chain and chain.expirations and chain.strikes:
             # Try to get a quote for a near-the-money option
             exp = chain.expirations[0]
-            strikes = chain.strikes.get(exp, [])
-            if strikes:
+            strikes = chain.strikes.get(exp)
+            if strikes is not None and strikes.size:
                 # Get current SPY price to find near-the-money strike
                 spy_price = spy_quote.get("last") or spy_quote.get("bid") or spy_quote.get("ask")
-                import math
-                
-                # Check if price is valid (not NaN)
-                if spy_price and not (isinstance(spy_price, float) and math.isnan(spy_price)):
+
+                # Quotes report unset (NaN) ticks as None
+                if spy_price:
                     # Find closest strike
-                    closest_strike = min(strikes, key=lambda x: abs(x - spy_price))
+                    closest_strike = chain.nearest_strike(exp, spy_price)
                 else:
                     # Use a reasonable default strike if price unavailable
                     # SPY is typically around 400-500, so use middle of strikes
-                    if strikes:
-                        closest_strike = strikes[len(strikes) // 2]  # Use middle strike
-                    else:
-                        print("⚠ No strikes available for testing")
-                        closest_strike = None
+                    closest_strike = float(strikes[len(strikes) // 2])  # Use middle strike
                 
                 if closest_strike is None:
                     print("⚠ Cannot test option quote (no valid strike)")
@@ -175,35 +170,40 @@ def run_doctor():
         _print_summary(results)
 
     finally:
-        ib_conn.disconnect()
+        get_ib_conn().disconnect()
 
 
 def _print_summary(results: Dict):
     """Print diagnostic summary."""
-    print(f"\nConnection: {'✓' if results['connection'] else '✗'}")
-    print(f"Account: {results['account_id'] or 'N/A'}")
-    print(f"Paper Account: {'✓' if results['is_paper'] else '✗'}")
-    print(f"Market Data: {'✓' if results['market_data'] else '✗'}")
-    print(f"Options Chain: {'✓' if results['options_chain'] else '✗'}")
-    print(f"Greeks Available: {'✓' if results['greeks_available'] else '✗'}")
-
-    if results["errors"]:
-        print("\nErrors:")
-        for error in results["errors"]:
-            print(f"  - {error}")
-
-    if all([
-        results["connection"],
-        results["account_id"],
-        results["market_data"],
-        results["options_chain"]
-    ]):
-        print("\n✓ All critical checks passed!")
-        if not results["greeks_available"]:
-            print("⚠ Warning: Greeks not available - consider checking market data subscriptions")
-        if config.require_greeks and not results["greeks_available"]:
-            results["errors"].append("Greeks required but not available (REQUIRE_GREEKS=true)")
-            print("\n✗ Doctor failed: REQUIRE_GREEKS=true but Greeks are not available.")
-            sys.exit(1)
-    else:
-        print("\n✗ Some checks failed - please review errors above")
+    # Build the summary and write it in one call, even when exiting below
+    lines = [
+        f"\nConnection: {'✓' if results['connection'] else '✗'}",
+        f"Account: {results['account_id'] or 'N/A'}",
+        f"Paper Account: {'✓' if results['is_paper'] else '✗'}",
+        f"Market Data: {'✓' if results['market_data'] else '✗'}",
+        f"Options Chain: {'✓' if results['options_chain'] else '✗'}",
+        f"Greeks Available: {'✓' if results['greeks_available'] else '✗'}",
+    ]
+    try:
+        if results["errors"]:
+            lines.append("\nErrors:")
+            lines.extend(f"  - {error}" for error in results["errors"])
+
+        if all([
+            results["connection"],
+            results["account_id"],
+            results["market_data"],
+            results["options_chain"]
+        ]):
+            lines.append("\n✓ All critical checks passed!")
+            if not results["greeks_available"]:
+                lines.append("⚠ Warning: Greeks not available - consider checking market data subscriptions")
+            if config.require_greeks and not results["greeks_available"]:
+                results["errors"].append("Greeks required but not available (REQUIRE_GREEKS=true)")
+                lines.append("\n✗ Doctor failed: REQUIRE_GREEKS=true but Greeks are not available.")
+                sys.exit(1)
+        else:
+            lines.append("\n✗ Some checks failed - please review errors above")
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
@@ -1,85 +1,74 @@
 """Export service for CSV export."""
 
 import csv
-from datetime import datetime
-from typing import List
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Iterable, List, Sequence, TextIO
 
-from ..db.repo import repo
+from sqlalchemy import DateTime, select
+from sqlalchemy.orm import Session
+
+from ..db.repo import get_repo
 from ..db.schema import Trade, Order, Fill
 from ..logging_setup import get_logger
 
 logger = get_logger(__name__)
 
+# Rows fetched from the database cursor per batch
+EXPORT_BATCH_SIZE = 5000
+
+# Write buffer for CSV files
+FILE_BUFFER_SIZE = 1 << 20
+
+TRADE_COLUMNS = (
+    Trade.id, Trade.ts_open, Trade.ts_close, Trade.symbol, Trade.exp, Trade.short_strike,
+    Trade.long_strike, Trade.qty, Trade.credit, Trade.debit_to_close, Trade.status, Trade.pnl,
+    Trade.reason_open, Trade.reason_close
+)
+ORDER_COLUMNS = (
+    Order.id, Order.trade_id, Order.ts, Order.action, Order.order_type, Order.limit_price,
+    Order.status, Order.ib_order_id
+)
+FILL_COLUMNS = (Fill.id, Fill.order_id, Fill.ts, Fill.price, Fill.qty)
 
-def export_to_csv(filepath: str):
-    """Export trades, orders, and fills to CSV."""
-    with repo.get_session() as session:
-        # Get all trades
-        trades = session.query(Trade).all()
-        orders = session.query(Order).all()
-        fills = session.query(Fill).all()
 
-    # Write trades
-    trades_file = filepath.replace(".csv", "_trades.csv")
-    with open(trades_file, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "id", "ts_open", "ts_close", "symbol", "exp", "short_strike", "long_strike",
-            "qty", "credit", "debit_to_close", "status", "pnl", "reason_open", "reason_close"
-        ])
-        for trade in trades:
-            writer.writerow([
-                trade.id,
-                trade.ts_open.isoformat() if trade.ts_open else "",
-                trade.ts_close.isoformat() if trade.ts_close else "",
-                trade.symbol,
-                trade.exp.isoformat() if trade.exp else "",
-                trade.short_strike,
-                trade.long_strike,
-                trade.qty,
-                trade.credit,
-                trade.debit_to_close,
-                trade.status,
-                trade.pnl,
-                trade.reason_open,
-                trade.reason_close
-            ])
+def _format_rows(rows: Iterable[Sequence[Any]], columns: Sequence) -> Iterable[List[Any]]:
+    """Yield CSV rows with datetimes in ISO format."""
+    datetime_indexes = [i for i, column in enumerate(columns) if isinstance(column.type, DateTime)]
+    for row in rows:
+        row = list(row)
+        for i in datetime_indexes:
+            value = row[i]
+            row[i] = value.isoformat() if value else ""
+        yield row
 
-    # Write orders
-    orders_file = filepath.replace(".csv", "_orders.csv")
-    with open(orders_file, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "id", "trade_id", "ts", "action", "order_type", "limit_price",
-            "status", "ib_order_id"
-        ])
-        for order in orders:
-            writer.writerow([
-                order.id,
-                order.trade_id,
-                order.ts.isoformat() if order.ts else "",
-                order.action,
-                order.order_type,
-                order.limit_price,
-                order.status,
-                order.ib_order_id
-            ])
 
-    # Write fills
-    fills_file = filepath.replace(".csv", "_fills.csv")
-    with open(fills_file, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "id", "order_id", "ts", "price", "qty"
-        ])
-        for fill in fills:
-            writer.writerow([
-                fill.id,
-                fill.order_id,
-                fill.ts.isoformat() if fill.ts else "",
-                fill.price,
-                fill.qty
-            ])
+def _export_table(session: Session, f: TextIO, columns: Sequence):
+    """Stream the selected columns of a table into a CSV file."""
+    rows = session.execute(select(*columns).execution_options(yield_per=EXPORT_BATCH_SIZE))
+    writer = csv.writer(f)
+    writer.writerow([column.key for column in columns])
+    writer.writerows(_format_rows(rows, columns))
+
+
+def export_to_csv(filepath: str):
+    """Export trades, orders, and fills to CSV."""
+    path = Path(filepath)
+    if not path.suffix:
+        path = path.with_suffix(".csv")
+    trades_file = path.with_stem(f"{path.stem}_trades")
+    orders_file = path.with_stem(f"{path.stem}_orders")
+    fills_file = path.with_stem(f"{path.stem}_fills")
+
+    with ExitStack() as stack:
+        trades_f, orders_f, fills_f = (
+            stack.enter_context(open(p, "w", newline="", buffering=FILE_BUFFER_SIZE))
+            for p in (trades_file, orders_file, fills_file)
+        )
+        session = stack.enter_context(get_repo().get_session())
+        _export_table(session, trades_f, TRADE_COLUMNS)
+        _export_table(session, orders_f, ORDER_COLUMNS)
+        _export_table(session, fills_f, FILL_COLUMNS)
 
     logger.info(f"Exported data to {trades_file}, {orders_file}, {fills_file}")
     print(f"Exported to:")
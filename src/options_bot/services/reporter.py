@@ -1,9 +1,11 @@
 """Reporting service."""
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import List
 
-from ..db.repo import repo
+from sqlalchemy import select
+
+from ..db.repo import get_repo
 from ..db.schema import Trade, DailyStats
 from ..logging_setup import get_logger
 
@@ -15,19 +17,22 @@ def generate_daily_report() -> str:
     today = date.today()
 
     # Get daily stats
-    stats = repo.get_or_create_daily_stats(today)
+    stats = get_repo().get_or_create_daily_stats(today)
 
-    # Get today's trades
-    with repo.get_session() as session:
+    # Get today's and open trades as plain rows rather than ORM objects
+    with get_repo().get_session() as session:
         today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
-        trades = session.query(Trade).filter(
+        trades = session.execute(select(
+            Trade.symbol, Trade.exp, Trade.short_strike, Trade.long_strike, Trade.status, Trade.pnl
+        ).where(
             Trade.ts_open >= today_start,
-            Trade.ts_open <= today_end
-        ).all()
+            Trade.ts_open < today_start + timedelta(days=1)
+        )).all()
+        open_trades = session.execute(select(
+            Trade.symbol, Trade.exp, Trade.short_strike, Trade.long_strike, Trade.credit
+        ).where(Trade.status == "open")).all()
 
     # Calculate metrics
-    open_trades = repo.get_open_trades()
     total_pnl = stats.realized_pnl + stats.unrealized_pnl
     win_rate = 0.0
     if stats.wins_count + stats.losses_count > 0:
@@ -58,11 +63,11 @@ def generate_daily_report() -> str:
         report.append("-" * 80)
         report.append(f"{'Symbol':<8} {'Exp':<12} {'Strikes':<20} {'Status':<10} {'P/L':<10}")
         report.append("-" * 80)
-        for trade in trades:
-            strikes = f"{trade.short_strike}/{trade.long_strike}"
-            pnl_str = f"${trade.pnl:.2f}" if trade.pnl else "N/A"
-            report.append(f"{trade.symbol:<8} {trade.exp.strftime('%Y%m%d'):<12} {strikes:<20} "
-                         f"{trade.status:<10} {pnl_str:<10}")
+        for symbol, exp, short_strike, long_strike, status, pnl in trades:
+            strikes = f"{short_strike}/{long_strike}"
+            pnl_str = f"${pnl:.2f}" if pnl else "N/A"
+            report.append(f"{symbol:<8} {exp.strftime('%Y%m%d'):<12} {strikes:<20} "
+                         f"{status:<10} {pnl_str:<10}")
 
     if open_trades:
         report.append("")
@@ -71,11 +76,12 @@ def generate_daily_report() -> str:
         report.append(f"{'Symbol':<8} {'Exp':<12} {'Strikes':<20} {'Credit':<10} {'DTE':<5}")
         report.append("-" * 80)
         from ..time_utils import days_to_expiration, now_et
-        for trade in open_trades:
-            strikes = f"{trade.short_strike}/{trade.long_strike}"
-            dte = days_to_expiration(trade.exp, now_et())
-            report.append(f"{trade.symbol:<8} {trade.exp.strftime('%Y%m%d'):<12} {strikes:<20} "
-                         f"${trade.credit:<9.2f} {dte:<5}")
+        now = now_et()
+        for symbol, exp, short_strike, long_strike, credit in open_trades:
+            strikes = f"{short_strike}/{long_strike}"
+            dte = days_to_expiration(exp, now)
+            report.append(f"{symbol:<8} {exp.strftime('%Y%m%d'):<12} {strikes:<20} "
+                         f"${credit:<9.2f} {dte:<5}")
 
     report.append("\n" + "=" * 80)
 
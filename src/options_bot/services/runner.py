@@ -1,149 +1,180 @@
 """Runner service for trading sessions."""
 
+import asyncio
 import time
 from datetime import datetime, timedelta
 
+from ib_insync import util
+
 from ..config import config
 from ..logging_setup import get_logger
 from ..time_utils import is_in_entry_window, now_et
-from ..ibkr.connection import ib_conn
-from ..db.repo import repo
-from ..strategy.selector import get_top_candidates
+from ..ibkr.connection import get_ib_conn
+from ..db.repo import get_repo
+from ..strategy.selector import scan_symbols_async
 from ..strategy.risk import (
     can_open_new_trade,
-    has_open_trade_for_symbol,
     calculate_position_size,
     update_daily_stats_for_trade_open
 )
 from ..ibkr.combo_orders import place_spread_order_open
-from ..strategy.manager import manage_open_trades
+from ..strategy.manager import manage_open_trades, manage_open_trades_async
 
 logger = get_logger(__name__)
 
+# Maximum seconds between session loop iterations
+SESSION_POLL_SECONDS = 30
+
+
+async def _run_entry_pass(bot_run_id: int):
+    """Scan for candidates and open at most one trade per symbol."""
+    # Limits are symbol-independent, so check them once per pass
+    can_open, reason = can_open_new_trade()
+    if not can_open:
+        logger.info(f"Cannot open new trade: {reason}")
+        return
+
+    open_symbols = get_repo().get_open_symbols()
+    scan_symbols = []
+    for symbol in config.underlyings:
+        if symbol in open_symbols:
+            logger.info(f"Already have open trade for {symbol}")
+            continue
+        scan_symbols.append(symbol)
+
+    # Scan all symbols concurrently, then place orders one at a time
+    candidates_by_symbol = await scan_symbols_async(scan_symbols, limit=3)
+
+    for symbol in scan_symbols:
+        candidates = candidates_by_symbol[symbol]
+        if not candidates:
+            logger.info(f"No candidates found for {symbol}")
+            continue
+
+        # Try to open the best candidate
+        opened = False
+        for candidate in candidates:
+            # Calculate position size
+            position_size = calculate_position_size(candidate.max_loss)
+            if position_size <= 0:
+                logger.warning(f"Invalid position size for {symbol}")
+                continue
+
+            # Calculate target credit (use mid price)
+            target_credit = (candidate.short_bid + candidate.short_ask) / 2 - \
+                          (candidate.long_bid + candidate.long_ask) / 2
+
+            logger.info(f"Attempting to open trade: {symbol} {candidate.expiration} "
+                      f"{candidate.short_strike}/{candidate.long_strike} "
+                      f"qty={position_size} credit={target_credit:.2f}")
+
+            # Place order (if trading enabled)
+            if not config.trading_disabled:
+                order_result = place_spread_order_open(
+                    symbol,
+                    candidate.expiration,
+                    candidate.short_strike,
+                    candidate.long_strike,
+                    position_size,
+                    target_credit
+                )
+
+                if order_result:
+                    # Create trade record
+                    exp_date = datetime.strptime(candidate.expiration, "%Y%m%d")
+                    trade = get_repo().create_trade(
+                        bot_run_id=bot_run_id,
+                        symbol=symbol,
+                        exp=exp_date,
+                        short_strike=candidate.short_strike,
+                        long_strike=candidate.long_strike,
+                        qty=order_result["quantity"],  # may be a partial fill
+                        credit=target_credit,
+                        reason_open=f"Delta: {candidate.short_delta}, Method: {candidate.selection_method}"
+                    )
+
+                    # Update daily stats
+                    update_daily_stats_for_trade_open()
+
+                    logger.info(f"Trade opened: ID={trade.id}")
+                    opened = True
+                    break  # Only one trade per symbol
+            else:
+                logger.info("Trading disabled - would open trade but skipping")
+                break  # Simulate opening one trade
+
+        # Re-check limits now that a trade has been opened
+        if opened:
+            can_open, reason = can_open_new_trade()
+            if not can_open:
+                logger.info(f"Cannot open new trade: {reason}")
+                return
+
+
+async def run_session_async(duration_minutes: int):
+    """Run a trading session on the IB event loop."""
+    # Create bot run record
+    bot_run = get_repo().create_bot_run("run", f"Session duration: {duration_minutes} minutes")
+
+    end_time = now_et() + timedelta(minutes=duration_minutes)
+    last_manage_time = now_et()
+
+    while now_et() < end_time:
+        current_time = now_et()
+
+        # Management loop
+        if (current_time - last_manage_time).total_seconds() >= config.manage_interval_seconds:
+            logger.info("Running management loop...")
+            await manage_open_trades_async()
+            last_manage_time = current_time
+
+        # Entry window - scan and potentially open trades
+        if is_in_entry_window():
+            logger.info("In entry window - scanning for candidates...")
+            await _run_entry_pass(bot_run.id)
+
+        # Wait for the next poll, letting IB events drain meanwhile
+        next_manage_time = last_manage_time + timedelta(seconds=config.manage_interval_seconds)
+        wait_until = min(now_et() + timedelta(seconds=SESSION_POLL_SECONDS), next_manage_time, end_time)
+        await asyncio.sleep(max(0.0, (wait_until - now_et()).total_seconds()))
+
+    # Final management pass
+    logger.info("Session ending - final management pass...")
+    await manage_open_trades_async()
+
+    # Update bot run
+    get_repo().update_bot_run(bot_run.id, ended_at=now_et())
+
+    logger.info("Trading session completed")
+
 
 def run_session(duration_minutes: int):
     """Run a trading session."""
     logger.info(f"Starting trading session for {duration_minutes} minutes")
 
     # Connect to IB
-    if not ib_conn.connect():
+    if not get_ib_conn().connect():
         logger.error("Failed to connect to IB Gateway")
         return
 
     try:
-        # Create bot run record
-        bot_run = repo.create_bot_run("run", f"Session duration: {duration_minutes} minutes")
-
-        end_time = now_et() + timedelta(minutes=duration_minutes)
-        last_manage_time = now_et()
-
-        while now_et() < end_time:
-            current_time = now_et()
-
-            # Management loop
-            if (current_time - last_manage_time).total_seconds() >= config.manage_interval_seconds:
-                logger.info("Running management loop...")
-                manage_open_trades()
-                last_manage_time = current_time
-
-            # Entry window - scan and potentially open trades
-            if is_in_entry_window():
-                logger.info("In entry window - scanning for candidates...")
-
-                for symbol in config.underlyings:
-                    # Check if we can open a new trade
-                    can_open, reason = can_open_new_trade()
-                    if not can_open:
-                        logger.info(f"Cannot open new trade: {reason}")
-                        continue
-
-                    # Check if we already have an open trade for this symbol
-                    if has_open_trade_for_symbol(symbol):
-                        logger.info(f"Already have open trade for {symbol}")
-                        continue
-
-                    # Get top candidates
-                    candidates = get_top_candidates(symbol, limit=3)
-                    if not candidates:
-                        logger.info(f"No candidates found for {symbol}")
-                        continue
-
-                    # Try to open the best candidate
-                    for candidate in candidates:
-                        # Calculate position size
-                        position_size = calculate_position_size(candidate.max_loss)
-                        if position_size <= 0:
-                            logger.warning(f"Invalid position size for {symbol}")
-                            continue
-
-                        # Calculate target credit (use mid price)
-                        target_credit = (candidate.short_bid + candidate.short_ask) / 2 - \
-                                      (candidate.long_bid + candidate.long_ask) / 2
-
-                        logger.info(f"Attempting to open trade: {symbol} {candidate.expiration} "
-                                  f"{candidate.short_strike}/{candidate.long_strike} "
-                                  f"qty={position_size} credit={target_credit:.2f}")
-
-                        # Place order (if trading enabled)
-                        if not config.trading_disabled:
-                            order_result = place_spread_order_open(
-                                symbol,
-                                candidate.expiration,
-                                candidate.short_strike,
-                                candidate.long_strike,
-                                position_size,
-                                target_credit
-                            )
-
-                            if order_result:
-                                # Create trade record
-                                exp_date = datetime.strptime(candidate.expiration, "%Y%m%d")
-                                trade = repo.create_trade(
-                                    bot_run_id=bot_run.id,
-                                    symbol=symbol,
-                                    exp=exp_date,
-                                    short_strike=candidate.short_strike,
-                                    long_strike=candidate.long_strike,
-                                    qty=position_size,
-                                    credit=target_credit,
-                                    reason_open=f"Delta: {candidate.short_delta}, Method: {candidate.selection_method}"
-                                )
-
-                                # Update daily stats
-                                update_daily_stats_for_trade_open()
-
-                                logger.info(f"Trade opened: ID={trade.id}")
-                                break  # Only one trade per symbol
-                        else:
-                            logger.info("Trading disabled - would open trade but skipping")
-                            break  # Simulate opening one trade
-
-            # Sleep before next iteration
-            time.sleep(30)  # Check every 30 seconds
-
-        # Final management pass
-        logger.info("Session ending - final management pass...")
-        manage_open_trades()
-
-        # Update bot run
-        repo.update_bot_run(bot_run.id, ended_at=now_et())
-
-        logger.info("Trading session completed")
-
+        # Blocking ib_insync calls made from within the session need a re-entrant loop
+        util.patchAsyncio()
+        get_ib_conn().ib.run(run_session_async(duration_minutes))
     finally:
-        ib_conn.disconnect()
+        get_ib_conn().disconnect()
 
 
 def run_manage_only():
     """Run management only (no new entries)."""
     logger.info("Starting management-only mode")
 
-    if not ib_conn.connect():
+    if not get_ib_conn().connect():
         logger.error("Failed to connect to IB Gateway")
         return
 
     try:
-        bot_run = repo.create_bot_run("manage", "Management-only mode")
+        bot_run = get_repo().create_bot_run("manage", "Management-only mode")
 
         # Run management loop continuously
         try:
@@ -153,7 +184,7 @@ def run_manage_only():
         except KeyboardInterrupt:
             logger.info("Management mode interrupted by user")
         finally:
-            repo.update_bot_run(bot_run.id, ended_at=now_et())
+            get_repo().update_bot_run(bot_run.id, ended_at=now_et())
 
     finally:
-        ib_conn.disconnect()
+        get_ib_conn().disconnect()
@@ -0,0 +1,58 @@
+"""Black-Scholes Greeks computed locally over strike grids."""
+
+import numpy as np
+
+# Annual risk-free rate assumed for local pricing
+RISK_FREE_RATE = 0.05
+
+# Volatility range a strike's delta is evaluated over when prefiltering
+PREFILTER_VOL_LOW = 0.05
+PREFILTER_VOL_HIGH = 1.0
+
+# Abramowitz & Stegun 7.1.26 erf coefficients (absolute error < 1.5e-7)
+_ERF_P = 0.3275911
+_ERF_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF, vectorized over an array."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + _ERF_P * z)
+    a1, a2, a3, a4, a5 = _ERF_A
+    poly = t * (a1 + t * (a2 + t * (a3 + t * (a4 + t * a5))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.copysign(erf, x))
+
+
+def bs_delta(
+    underlying_price: float,
+    strikes: np.ndarray,
+    years: float,
+    sigma: float,
+    right: str,
+    rate: float = RISK_FREE_RATE
+) -> np.ndarray:
+    """Black-Scholes delta for every strike in the array."""
+    strikes = np.asarray(strikes, dtype=np.float64)
+    d1 = (np.log(underlying_price / strikes) + (rate + 0.5 * sigma ** 2) * years) / (sigma * np.sqrt(years))
+    call_delta = norm_cdf(d1)
+    return call_delta - 1.0 if right == "P" else call_delta
+
+
+def strikes_in_delta_range(
+    underlying_price: float,
+    strikes: np.ndarray,
+    years: float,
+    delta_min: float,
+    delta_max: float,
+    right: str = "P"
+) -> np.ndarray:
+    """Mask of strikes whose |delta| can fall in [delta_min, delta_max].
+
+    An out-of-the-money option's |delta| grows with volatility, so a strike
+    is kept when the range lies between its deltas at the low and high
+    volatility bounds. This drops deep ITM/OTM strikes without quoting them.
+    """
+    low = np.abs(bs_delta(underlying_price, strikes, years, PREFILTER_VOL_LOW, right))
+    high = np.abs(bs_delta(underlying_price, strikes, years, PREFILTER_VOL_HIGH, right))
+    return (np.maximum(low, high) >= delta_min) & (np.minimum(low, high) <= delta_max)
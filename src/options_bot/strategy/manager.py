@@ -1,148 +1,292 @@
 """Trade management logic (TP/SL/time exits)."""
 
+import asyncio
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
 
 from ..config import config
-from ..db.repo import repo
+from ..db.repo import get_repo
+from ..db.schema import Trade
 from ..logging_setup import get_logger
 from ..time_utils import days_to_expiration, now_et
-from ..ibkr.options_chain import get_option_contract_with_greeks
+from ..ibkr.connection import get_ib_conn
+from ..ibkr.options_chain import get_option_contract_with_greeks, get_option_quotes_multi_async
 from ..ibkr.combo_orders import place_spread_order_close
 from ..strategy.risk import update_daily_stats_for_trade_close
 
 logger = get_logger(__name__)
 
+# (symbol, expiration, strike) of a put leg
+LegKey = Tuple[str, str, float]
 
-def check_trade_exits(trade_id: int) -> Optional[str]:
-    """Check if a trade should be closed. Returns reason or None."""
-    from ..db.schema import Trade
+# (symbol, expiration, short strike, long strike) of a put spread
+SpreadKey = Tuple[str, str, float, float]
 
-    # Get trade from database
-    with repo.get_session() as session:
-        trade = session.query(Trade).filter(Trade.id == trade_id).first()
-        if not trade or trade.status != "open":
-            return None
+# How long a spread's debit to close is reused before requoting
+DEBIT_CACHE_TTL_SECONDS = 5.0
 
-        # Get current spread value
-        exp_str = trade.exp.strftime("%Y%m%d")
-        short_opt = get_option_contract_with_greeks(
-            trade.symbol,
-            exp_str,
-            trade.short_strike,
-            "P"
-        )
-        long_opt = get_option_contract_with_greeks(
-            trade.symbol,
-            exp_str,
-            trade.long_strike,
-            "P"
+# Spread -> (debit to close, monotonic time it was quoted)
+_debit_cache: Dict[SpreadKey, Tuple[float, float]] = {}
+
+# Longest a single trade's fallback requote may take before it is abandoned
+LEG_QUOTE_TIMEOUT_SECONDS = 5.0
+
+
+@lru_cache(maxsize=256)
+def _exp_str(exp: datetime) -> str:
+    """IB expiration string for a trade's expiration."""
+    return exp.strftime("%Y%m%d")
+
+
+def _spread_key(trade: Trade) -> SpreadKey:
+    """Spread key for a trade's put legs."""
+    return (trade.symbol, _exp_str(trade.exp), trade.short_strike, trade.long_strike)
+
+
+def _trade_legs(trade: Trade) -> Tuple[LegKey, LegKey]:
+    """Leg keys for a trade's short and long puts."""
+    symbol, exp_str, short_strike, long_strike = _spread_key(trade)
+    return (symbol, exp_str, short_strike), (symbol, exp_str, long_strike)
+
+
+async def _quote_legs_async(legs: List[LegKey]) -> Dict[LegKey, Dict]:
+    """Quote put legs in one request, keyed by leg; unquoted legs are left out."""
+    quotes = await get_option_quotes_multi_async([(symbol, exp_str, strike, "P") for symbol, exp_str, strike in legs])
+    return {leg: quote for leg, quote in zip(legs, quotes) if quote is not None}
+
+
+async def fetch_leg_quotes_async(trades: Iterable[Trade]) -> Dict[LegKey, Dict]:
+    """Quote both legs of every trade in one batch, keyed by leg.
+
+    Trades the batch could not fully quote are requoted concurrently, each
+    bounded by LEG_QUOTE_TIMEOUT_SECONDS.
+    """
+    trades = list(trades)
+    legs = sorted({leg for trade in trades for leg in _trade_legs(trade)})
+    if not legs:
+        return {}
+
+    try:
+        quotes = await _quote_legs_async(legs)
+    except Exception as e:
+        logger.error(f"Error quoting open trade legs: {e}")
+        quotes = {}
+
+    # Trades sharing both legs are requoted once
+    retry = list(dict.fromkeys(
+        trade_legs for trade_legs in map(_trade_legs, trades)
+        if not all(leg in quotes for leg in trade_legs)
+    ))
+    if retry:
+        results = await asyncio.gather(
+            *(asyncio.wait_for(_quote_legs_async(list(trade_legs)), LEG_QUOTE_TIMEOUT_SECONDS) for trade_legs in retry),
+            return_exceptions=True
         )
+        for trade_legs, result in zip(retry, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning(f"Requoting {trade_legs[0][0]} {trade_legs[0][1]} legs timed out")
+            elif isinstance(result, Exception):
+                logger.error(f"Error requoting {trade_legs[0][0]} {trade_legs[0][1]} legs: {result}")
+            else:
+                quotes.update(result)
+    return quotes
+
+
+def fetch_leg_quotes(trades: Iterable[Trade]) -> Dict[LegKey, Dict]:
+    """Blocking wrapper around fetch_leg_quotes_async."""
+    if not get_ib_conn().is_connected():
+        logger.error("Not connected to IB")
+        return {}
+
+    return get_ib_conn().ib.run(fetch_leg_quotes_async(trades))
+
+
+def _spread_debit(key: SpreadKey, short_opt: Optional[Dict], long_opt: Optional[Dict]) -> Optional[float]:
+    """Debit to close a spread from its leg quotes, or None if they are unusable."""
+    symbol, exp_str, short_strike, long_strike = key
+    if not short_opt or not long_opt:
+        logger.warning(f"Cannot get quotes for {symbol} {exp_str} {short_strike}/{long_strike}")
+        return None
+
+    if not short_opt.get("has_bid_ask") or not long_opt.get("has_bid_ask"):
+        logger.warning(f"Missing bid/ask for {symbol} {exp_str} {short_strike}/{long_strike}")
+        return None
+
+    # Buy back the short, sell the long
+    debit = short_opt.get("ask", 0) - long_opt.get("bid", 0)
+    _debit_cache[key] = (debit, time.monotonic())
+    return debit
 
-        if not short_opt or not long_opt:
-            logger.warning(f"Cannot get quotes for trade {trade_id}")
-            return None
 
-        if not short_opt.get("has_bid_ask") or not long_opt.get("has_bid_ask"):
-            logger.warning(f"Missing bid/ask for trade {trade_id}")
-            return None
+def get_spread_debit(
+    symbol: str,
+    exp_str: str,
+    short_strike: float,
+    long_strike: float,
+    *,
+    ttl: float = DEBIT_CACHE_TTL_SECONDS
+) -> Optional[float]:
+    """Get the debit to close a put spread, reusing a quote from the last `ttl` seconds."""
+    key = (symbol, exp_str, short_strike, long_strike)
+    cached = _debit_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < ttl:
+        return cached[0]
 
-        # Calculate current spread value (debit to close)
-        short_ask = short_opt.get("ask", 0)
-        long_bid = long_opt.get("bid", 0)
-        current_debit = short_ask - long_bid
+    short_opt = get_option_contract_with_greeks(symbol, exp_str, short_strike, "P")
+    long_opt = get_option_contract_with_greeks(symbol, exp_str, long_strike, "P")
+    return _spread_debit(key, short_opt, long_opt)
 
-        # Check take-profit: close when debit <= 50% of credit
-        tp_threshold = trade.credit * config.tp_capture_pct
-        if current_debit <= tp_threshold:
-            return "take_profit"
 
-        # Check stop-loss: close when debit >= 2.0x credit
-        sl_threshold = trade.credit * config.sl_multiple
-        if current_debit >= sl_threshold:
-            return "stop_loss"
+def invalidate_spread_debit(key: Optional[SpreadKey] = None):
+    """Forget a spread's cached debit, or every cached debit if no key is given."""
+    if key is None:
+        _debit_cache.clear()
+    else:
+        _debit_cache.pop(key, None)
 
-        # Check time exit: close when DTE <= 3
-        dte = days_to_expiration(trade.exp, now_et())
-        if dte <= config.time_exit_dte:
-            return "time_exit"
 
+def _session_scope(session: Optional[Session]):
+    """Use the caller's session as is, or open a read session closed on exit."""
+    return nullcontext(session) if session is not None else get_repo().get_session()
+
+
+def check_trade_exits(
+    trade_id: int,
+    quotes: Optional[Dict[LegKey, Dict]] = None,
+    session: Optional[Session] = None
+) -> Optional[str]:
+    """Check if a trade should be closed. Returns reason or None.
+
+    Leg quotes are looked up in ``quotes`` when given (see fetch_leg_quotes),
+    otherwise fetched individually unless a recent debit is cached. The trade
+    is read through ``session`` when given.
+    """
+    # Only the lookup needs the session; quoting below may wait on IB
+    with _session_scope(session) as session:
+        trade = session.get(Trade, trade_id)
+    if not trade or trade.status != "open":
+        return None
+
+    # Get current spread value (debit to close)
+    key = _spread_key(trade)
+    symbol, exp_str = key[:2]
+    if quotes is not None:
+        current_debit = _spread_debit(
+            key,
+            quotes.get((symbol, exp_str, trade.short_strike)),
+            quotes.get((symbol, exp_str, trade.long_strike))
+        )
+    else:
+        current_debit = get_spread_debit(*key)
+
+    if current_debit is None:
         return None
 
+    # Check take-profit: close when debit <= 50% of credit
+    tp_threshold = trade.credit * config.tp_capture_pct
+    if current_debit <= tp_threshold:
+        return "take_profit"
+
+    # Check stop-loss: close when debit >= 2.0x credit
+    sl_threshold = trade.credit * config.sl_multiple
+    if current_debit >= sl_threshold:
+        return "stop_loss"
 
-def close_trade(trade_id: int, reason: str) -> bool:
-    """Close a trade."""
-    from ..db.schema import Trade
+    # Check time exit: close when DTE <= 3
+    dte = days_to_expiration(trade.exp, now_et())
+    if dte <= config.time_exit_dte:
+        return "time_exit"
 
-    with repo.get_session() as session:
-        trade = session.query(Trade).filter(Trade.id == trade_id).first()
-        if not trade or trade.status != "open":
-            return False
+    return None
 
-        # Get current spread value
-        exp_str = trade.exp.strftime("%Y%m%d")
-        short_opt = get_option_contract_with_greeks(
+
+def close_trade(trade_id: int, reason: str, session: Optional[Session] = None) -> bool:
+    """Close a trade, reading it through ``session`` when given."""
+    # Only the lookup needs the session; quoting and the close order wait on IB
+    with _session_scope(session) as session:
+        trade = session.get(Trade, trade_id)
+    if not trade or trade.status != "open":
+        return False
+
+    # Get current spread value, reusing the quote the exit check just made
+    key = _spread_key(trade)
+    exp_str = key[1]
+    debit_to_close = get_spread_debit(*key)
+
+    if debit_to_close is None:
+        logger.error(f"Cannot get quotes to close trade {trade_id}")
+        return False
+
+    # Calculate P/L
+    pnl = (trade.credit - debit_to_close) * trade.qty
+
+    # Place close order (if trading enabled)
+    if not config.trading_disabled:
+        order_result = place_spread_order_close(
             trade.symbol,
             exp_str,
             trade.short_strike,
-            "P"
-        )
-        long_opt = get_option_contract_with_greeks(
-            trade.symbol,
-            exp_str,
             trade.long_strike,
-            "P"
+            trade.qty,
+            debit_to_close
         )
+        if not order_result:
+            logger.warning(f"Failed to place close order for trade {trade_id}")
+    else:
+        logger.info(f"Trading disabled - simulating close for trade {trade_id}")
 
-        if not short_opt or not long_opt:
-            logger.error(f"Cannot get quotes to close trade {trade_id}")
-            return False
-
-        short_ask = short_opt.get("ask", 0)
-        long_bid = long_opt.get("bid", 0)
-        debit_to_close = short_ask - long_bid
-
-        # Calculate P/L
-        pnl = (trade.credit - debit_to_close) * trade.qty
-
-        # Place close order (if trading enabled)
-        if not config.trading_disabled:
-            order_result = place_spread_order_close(
-                trade.symbol,
-                exp_str,
-                trade.short_strike,
-                trade.long_strike,
-                trade.qty,
-                debit_to_close
-            )
-            if not order_result:
-                logger.warning(f"Failed to place close order for trade {trade_id}")
-        else:
-            logger.info(f"Trading disabled - simulating close for trade {trade_id}")
-
-        # Update trade in database
-        repo.update_trade(
-            trade_id,
-            status="closed",
-            debit_to_close=debit_to_close,
-            pnl=pnl,
-            reason_close=reason
-        )
+    # Update trade in database
+    get_repo().update_trade(
+        trade_id,
+        status="closed",
+        debit_to_close=debit_to_close,
+        pnl=pnl,
+        reason_close=reason
+    )
 
-        # Update daily stats
-        update_daily_stats_for_trade_close(pnl)
+    # Update daily stats
+    update_daily_stats_for_trade_close(pnl)
 
-        logger.info(f"Closed trade {trade_id}: {reason}, P/L: ${pnl:.2f}")
-        return True
+    # The spread is gone; don't let a later lookup reuse its quote
+    invalidate_spread_debit(key)
 
+    logger.info(f"Closed trade {trade_id}: {reason}, P/L: ${pnl:.2f}")
+    return True
 
-def manage_open_trades():
-    """Check and manage all open trades."""
-    open_trades = repo.get_open_trades()
-    logger.info(f"Managing {len(open_trades)} open trades")
 
+def _apply_exits(open_trades: List[Trade], quotes: Dict[LegKey, Dict]):
+    """Close every trade whose exit conditions are met.
+
+    Each trade is re-read by primary key in its own short session, so the
+    decision sees writes made since the open trades were listed.
+    """
     for trade in open_trades:
-        reason = check_trade_exits(trade.id)
+        reason = check_trade_exits(trade.id, quotes)
         if reason:
             logger.info(f"Trade {trade.id} should be closed: {reason}")
             close_trade(trade.id, reason)
+
+
+async def manage_open_trades_async():
+    """Check and manage all open trades without blocking the event loop while quoting."""
+    # No session is held across the IB round-trips below
+    open_trades = get_repo().get_open_trades()
+    logger.info(f"Managing {len(open_trades)} open trades")
+
+    # One quote batch for every leg instead of two requests per trade
+    quotes = await fetch_leg_quotes_async(open_trades)
+    _apply_exits(open_trades, quotes)
+
+
+def manage_open_trades():
+    """Check and manage all open trades."""
+    open_trades = get_repo().get_open_trades()
+    logger.info(f"Managing {len(open_trades)} open trades")
+
+    quotes = fetch_leg_quotes(open_trades)
+    _apply_exits(open_trades, quotes)
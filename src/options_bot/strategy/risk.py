@@ -1,14 +1,51 @@
 """Risk management module."""
 
+import time
 from datetime import date
-from typing import Optional
+from typing import Optional, Tuple
 
 from ..config import config
-from ..db.repo import repo
+from ..db.repo import get_repo
+from ..db.schema import DailyStats
 from ..logging_setup import get_logger
 
 logger = get_logger(__name__)
 
+# How long today's stats row is reused for reporting before re-reading. The
+# kill switches always re-read, since a separate manage-only process may
+# record closed trades this process never hears about.
+DAILY_STATS_TTL_SECONDS = 30.0
+
+# (day, monotonic fetch time, stats) for the most recent lookup
+_daily_stats_cache: Optional[Tuple[date, float, DailyStats]] = None
+
+
+def _get_today_stats() -> DailyStats:
+    """Get today's daily stats, reusing a recent lookup."""
+    global _daily_stats_cache
+    today = date.today()
+    now = time.monotonic()
+    if _daily_stats_cache is not None:
+        day, fetched_at, stats = _daily_stats_cache
+        if day == today and now - fetched_at < DAILY_STATS_TTL_SECONDS:
+            return stats
+    stats = get_repo().get_or_create_daily_stats(today)
+    _daily_stats_cache = (today, now, stats)
+    return stats
+
+
+def invalidate_daily_stats_cache():
+    """Drop the cached daily stats so the next check re-reads them."""
+    global _daily_stats_cache
+    _daily_stats_cache = None
+
+
+def _loss_pct(stats: DailyStats) -> float:
+    """Today's loss as a fraction of the account."""
+    total_pnl = stats.realized_pnl + stats.unrealized_pnl
+    loss = -total_pnl if total_pnl < 0.0 else 0.0
+    return loss / config.account_size
+
 
 def calculate_position_size(max_loss: float) -> int:
     """Calculate position size based on risk per trade."""
@@ -23,21 +60,18 @@ def calculate_position_size(max_loss: float) -> int:
 
 def get_daily_pnl() -> tuple[float, float]:
     """Get today's realized and unrealized P/L."""
-    today = date.today()
-    stats = repo.get_or_create_daily_stats(today)
+    stats = _get_today_stats()
     return stats.realized_pnl, stats.unrealized_pnl
 
 
 def get_daily_loss_pct() -> float:
     """Get today's loss as percentage of account."""
-    realized, unrealized = get_daily_pnl()
-    total_pnl = realized + unrealized
-    loss_pct = abs(min(0, total_pnl)) / config.account_size
-    return loss_pct
+    return _loss_pct(_get_today_stats())
 
 
 def is_daily_loss_exceeded() -> bool:
     """Check if daily loss limit is exceeded."""
+    invalidate_daily_stats_cache()
     loss_pct = get_daily_loss_pct()
     exceeded = loss_pct >= config.max_daily_loss_pct
     if exceeded:
@@ -47,9 +81,7 @@ def is_daily_loss_exceeded() -> bool:
 
 def get_trades_today_count() -> int:
     """Get number of trades opened today."""
-    today = date.today()
-    stats = repo.get_or_create_daily_stats(today)
-    return stats.trades_count
+    return _get_today_stats().trades_count
 
 
 def can_open_new_trade() -> tuple[bool, str]:
@@ -58,12 +90,18 @@ def can_open_new_trade() -> tuple[bool, str]:
     if config.trading_disabled:
         return False, "Trading is disabled (TRADING_DISABLED=true)"
 
+    # One fresh stats lookup serves every check below
+    invalidate_daily_stats_cache()
+    stats = _get_today_stats()
+
     # Check daily loss
-    if is_daily_loss_exceeded():
-        return False, f"Daily loss limit exceeded ({get_daily_loss_pct():.2%})"
+    loss_pct = _loss_pct(stats)
+    if loss_pct >= config.max_daily_loss_pct:
+        logger.warning(f"Daily loss limit exceeded: {loss_pct:.2%} >= {config.max_daily_loss_pct:.2%}")
+        return False, f"Daily loss limit exceeded ({loss_pct:.2%})"
 
     # Check trade count
-    trades_today = get_trades_today_count()
+    trades_today = stats.trades_count
     if trades_today >= config.max_trades_per_day:
         return False, f"Max trades per day reached ({trades_today}/{config.max_trades_per_day})"
 
@@ -72,27 +110,21 @@ def can_open_new_trade() -> tuple[bool, str]:
 
 def has_open_trade_for_symbol(symbol: str) -> bool:
     """Check if there's an open trade for the symbol."""
-    open_trades = repo.get_open_trades(symbol=symbol)
-    return len(open_trades) > 0
+    return get_repo().has_open_trade(symbol)
 
 
 def update_daily_stats_for_trade_open():
     """Update daily stats when opening a trade."""
-    today = date.today()
-    stats = repo.get_or_create_daily_stats(today)
-    repo.update_daily_stats(today, trades_count=stats.trades_count + 1)
+    get_repo().increment_daily_stats(date.today(), trades_delta=1)
+    invalidate_daily_stats_cache()
 
 
 def update_daily_stats_for_trade_close(pnl: float):
     """Update daily stats when closing a trade."""
-    today = date.today()
-    stats = repo.get_or_create_daily_stats(today)
-    new_realized = stats.realized_pnl + pnl
-    new_wins = stats.wins_count + (1 if pnl > 0 else 0)
-    new_losses = stats.losses_count + (1 if pnl < 0 else 0)
-    repo.update_daily_stats(
-        today,
-        realized_pnl=new_realized,
-        wins_count=new_wins,
-        losses_count=new_losses
+    get_repo().increment_daily_stats(
+        date.today(),
+        realized_pnl_delta=pnl,
+        wins_delta=1 if pnl > 0 else 0,
+        losses_delta=1 if pnl < 0 else 0
     )
+    invalidate_daily_stats_cache()
@@ -1,23 +1,34 @@
 """Option selection logic for put credit spreads."""
 
-from datetime import datetime
+import asyncio
+import logging
 from typing import List, Optional, Dict
 from dataclasses import dataclass
 
+import numpy as np
+
 from ..config import config
 from ..logging_setup import get_logger
-from ..time_utils import days_to_expiration, now_et
+from ..time_utils import days_to_expiration_date, now_et, parse_yyyymmdd
+from ..ibkr.connection import get_ib_conn
 from ..ibkr.options_chain import (
-    get_option_chain,
+    get_option_chain_async,
     filter_expirations_by_dte,
-    get_option_contract_with_greeks
+    get_option_chain_snapshot_async
 )
-from ..ibkr.market_data import get_stock_quote
+from ..ibkr.market_data import get_stock_quote_async
+from .greeks import strikes_in_delta_range
 
 logger = get_logger(__name__)
 
+# Symbols scanned concurrently, keeping market data lines under IB's limit
+MAX_CONCURRENT_SCANS = 8
 
-@dataclass
+# Longest a single symbol's scan may take before it is abandoned
+SCAN_TIMEOUT_SECONDS = 20.0
+
+
+@dataclass(slots=True, frozen=True)
 class SpreadCandidate:
     """Represents a candidate put credit spread."""
     symbol: str
@@ -38,137 +49,273 @@ class SpreadCandidate:
     selection_method: str  # "delta" or "otm_fallback"
 
 
-def find_candidates(symbol: str) -> List[SpreadCandidate]:
-    """Find candidate put credit spreads for a symbol."""
-    candidates = []
+@dataclass
+class CandidateTable:
+    """Candidate spreads stored column-wise; rows become SpreadCandidates on demand.
+
+    Missing short deltas are NaN.
+    """
+    symbol: str
+    expiration: List[str]
+    selection_method: List[str]
+    dte: np.ndarray
+    short_strike: np.ndarray
+    long_strike: np.ndarray
+    short_delta: np.ndarray
+    credit: np.ndarray
+    max_loss: np.ndarray
+    short_bid: np.ndarray
+    short_ask: np.ndarray
+    long_bid: np.ndarray
+    long_ask: np.ndarray
+    short_bidask: np.ndarray
+    long_bidask: np.ndarray
+    has_greeks: np.ndarray
+
+    ARRAY_COLUMNS = (
+        "dte", "short_strike", "long_strike", "short_delta", "credit", "max_loss",
+        "short_bid", "short_ask", "long_bid", "long_ask", "short_bidask", "long_bidask", "has_greeks",
+    )
+
+    @classmethod
+    def concat(cls, symbol: str, tables: List["CandidateTable"]) -> "CandidateTable":
+        """Stack tables for the same symbol, keeping row order."""
+        return cls(
+            symbol=symbol,
+            expiration=[exp for table in tables for exp in table.expiration],
+            selection_method=[method for table in tables for method in table.selection_method],
+            **{
+                column: np.concatenate([getattr(table, column) for table in tables]) if tables else np.empty(0)
+                for column in cls.ARRAY_COLUMNS
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.expiration)
+
+    def top(self, limit: Optional[int] = None) -> List[SpreadCandidate]:
+        """Build candidates for the best `limit` rows (all rows if None) by credit.
+
+        Rows with equal credit keep their scan order.
+        """
+        rows = np.arange(len(self))
+        if limit is not None and len(self) > limit:
+            if limit <= 0:
+                return []
+            # Rows at or above the limit-th best credit; ties at the cutoff are all kept
+            floor = np.partition(self.credit, -limit)[-limit]
+            rows = np.flatnonzero(self.credit >= floor)
+        order = rows[np.argsort(-self.credit[rows], kind="stable")]
+        return [self.row(i) for i in order[:limit].tolist()]
+
+    def row(self, i: int) -> SpreadCandidate:
+        """Materialize a single row."""
+        short_delta = self.short_delta[i]
+        return SpreadCandidate(
+            symbol=self.symbol,
+            expiration=self.expiration[i],
+            dte=int(self.dte[i]),
+            short_strike=float(self.short_strike[i]),
+            long_strike=float(self.long_strike[i]),
+            short_delta=None if np.isnan(short_delta) else float(short_delta),
+            credit=float(self.credit[i]),
+            max_loss=float(self.max_loss[i]),
+            short_bid=float(self.short_bid[i]),
+            short_ask=float(self.short_ask[i]),
+            long_bid=float(self.long_bid[i]),
+            long_ask=float(self.long_ask[i]),
+            short_bidask_spread=float(self.short_bidask[i]),
+            long_bidask_spread=float(self.long_bidask[i]),
+            has_greeks=bool(self.has_greeks[i]),
+            selection_method=self.selection_method[i],
+        )
+
+
+def _quote_arrays(quotes: Dict[float, Dict], strikes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Gather per-strike quote fields into arrays; missing values are NaN/False."""
+    rows = [quotes.get(strike) or {} for strike in strikes.tolist()]
+
+    def numbers(key: str) -> np.ndarray:
+        return np.array([row.get(key) for row in rows], dtype=np.float64)  # None -> NaN
+
+    def flags(key: str) -> np.ndarray:
+        return np.array([bool(row.get(key)) for row in rows], dtype=bool)
+
+    return {
+        "bid": numbers("bid"),
+        "ask": numbers("ask"),
+        "bid_ask_spread": numbers("bid_ask_spread"),
+        "delta": numbers("delta"),
+        "has_bid_ask": flags("has_bid_ask"),
+        "has_greeks": flags("has_greeks"),
+    }
+
+
+async def scan_candidates_async(symbol: str) -> CandidateTable:
+    """Scan a symbol's chain for put credit spreads, in expiration/strike order."""
+    tables = []
 
     # Get underlying price
-    stock_quote = get_stock_quote(symbol)
+    stock_quote = await get_stock_quote_async(symbol)
     if not stock_quote or not stock_quote.get("has_bid_ask"):
         logger.warning(f"No valid quote for {symbol}")
-        return candidates
+        return CandidateTable.concat(symbol, tables)
 
     underlying_price = stock_quote.get("bid") or stock_quote.get("ask") or stock_quote.get("last")
     if not underlying_price:
         logger.warning(f"Cannot determine price for {symbol}")
-        return candidates
+        return CandidateTable.concat(symbol, tables)
 
     # Get option chain
-    chain = get_option_chain(symbol)
+    chain = await get_option_chain_async(symbol)
     if not chain:
         logger.warning(f"No option chain for {symbol}")
-        return candidates
+        return CandidateTable.concat(symbol, tables)
 
     # Filter expirations by DTE
     valid_expirations = filter_expirations_by_dte(chain.expirations, config.dte_min, config.dte_max)
     if not valid_expirations:
         logger.info(f"No expirations in DTE range {config.dte_min}-{config.dte_max} for {symbol}")
-        return candidates
+        return CandidateTable.concat(symbol, tables)
 
     # Process each expiration
+    today = now_et().date()
     for exp_str in valid_expirations:
         try:
-            exp_date = datetime.strptime(exp_str, "%Y%m%d")
-            dte = days_to_expiration(exp_date)
-            strikes = chain.strikes.get(exp_str, [])
+            exp_date = parse_yyyymmdd(exp_str)
+            dte = days_to_expiration_date(exp_date, today)
+            strikes = chain.strikes.get(exp_str)
 
-            if not strikes:
+            if strikes is None or not strikes.size:
                 continue
 
-            # Find candidate short puts
-            for short_strike in strikes:
-                # Calculate long strike
-                long_strike = short_strike - config.spread_width
-                if long_strike not in strikes:
-                    continue  # Long strike not available
-
-                # Get option data for both legs
-                short_opt = get_option_contract_with_greeks(symbol, exp_str, short_strike, "P")
-                long_opt = get_option_contract_with_greeks(symbol, exp_str, long_strike, "P")
-
-                if not short_opt or not long_opt:
-                    continue
-
-                # Check liquidity
-                if not short_opt.get("has_bid_ask") or not long_opt.get("has_bid_ask"):
-                    continue
-
-                short_bidask = short_opt.get("bid_ask_spread")
-                long_bidask = long_opt.get("bid_ask_spread")
-
-                if short_bidask is None or long_bidask is None:
-                    continue
-
-                if short_bidask > config.leg_max_bidask or long_bidask > config.leg_max_bidask:
-                    continue  # Spread too wide
-
-                # Check delta or use OTM fallback
-                short_delta = short_opt.get("delta")
-                has_greeks = short_opt.get("has_greeks", False)
-                selection_method = "delta"
-
-                if has_greeks and short_delta is not None:
-                    # Use delta filter
-                    if not (config.delta_min <= abs(short_delta) <= config.delta_max):
-                        continue  # Delta out of range
-                else:
-                    # No Greeks - check if we can use fallback
-                    if config.require_greeks:
-                        continue  # Reject if Greeks required
-                    # Use OTM fallback
-                    otm_pct = (underlying_price - short_strike) / underlying_price
-                    target_otm = config.otm_target_pct
-                    if not (target_otm * 0.8 <= otm_pct <= target_otm * 1.2):
-                        continue  # Not close enough to target OTM
-                    selection_method = "otm_fallback"
-                    logger.info(f"Using OTM fallback for {symbol} {exp_str} {short_strike}: {otm_pct:.2%}")
-
-                # Calculate credit and max loss
-                short_bid = short_opt.get("bid", 0)
-                short_ask = short_opt.get("ask", 0)
-                long_bid = long_opt.get("bid", 0)
-                long_ask = long_opt.get("ask", 0)
-
-                # Credit = short bid - long ask (we sell short, buy long)
-                credit = short_bid - long_ask
-                if credit <= 0:
-                    continue  # Not a credit spread
-
-                # Max loss = spread width - credit
-                max_loss = config.spread_width - credit
-
-                candidate = SpreadCandidate(
-                    symbol=symbol,
-                    expiration=exp_str,
-                    dte=dte,
-                    short_strike=short_strike,
-                    long_strike=long_strike,
-                    short_delta=short_delta,
-                    credit=credit,
-                    max_loss=max_loss,
-                    short_bid=short_bid,
-                    short_ask=short_ask,
-                    long_bid=long_bid,
-                    long_ask=long_ask,
-                    short_bidask_spread=short_bidask,
-                    long_bidask_spread=long_bidask,
-                    has_greeks=has_greeks,
-                    selection_method=selection_method
-                )
+            # Skip short strikes whose delta cannot reach the target range at any plausible volatility
+            short_strikes = strikes[strikes_in_delta_range(
+                underlying_price, strikes, max(dte, 1) / 365.0, config.delta_min, config.delta_max
+            )]
+
+            # Pair each short strike with the long strike one width below
+            long_strikes = short_strikes - config.spread_width
+            long_idx = np.minimum(np.searchsorted(strikes, long_strikes), len(strikes) - 1)
+            paired = strikes[long_idx] == long_strikes
+            short_strikes, long_strikes = short_strikes[paired], long_strikes[paired]
+            if not short_strikes.size:
+                continue
+
+            # Quote every leg of the expiration in one batch
+            leg_strikes = np.union1d(short_strikes, long_strikes)
+            quotes = await get_option_chain_snapshot_async(symbol, exp_str, leg_strikes.tolist(), "P")
+            legs = _quote_arrays(quotes, leg_strikes)
+            short = {field: values[np.searchsorted(leg_strikes, short_strikes)] for field, values in legs.items()}
+            long = {field: values[np.searchsorted(leg_strikes, long_strikes)] for field, values in legs.items()}
+
+            # Check liquidity (NaN spreads from missing quotes compare False)
+            keep = short["has_bid_ask"] & long["has_bid_ask"]
+            keep &= (short["bid_ask_spread"] <= config.leg_max_bidask) & (long["bid_ask_spread"] <= config.leg_max_bidask)
+
+            # Check delta or use OTM fallback
+            use_delta = short["has_greeks"] & ~np.isnan(short["delta"])
+            abs_delta = np.abs(short["delta"])
+            delta_ok = use_delta & (abs_delta >= config.delta_min) & (abs_delta <= config.delta_max)
+            otm_pct = (underlying_price - short_strikes) / underlying_price
+            target_otm = config.otm_target_pct
+            fallback_ok = ~use_delta & (otm_pct >= target_otm * 0.8) & (otm_pct <= target_otm * 1.2)
+            if config.require_greeks:
+                fallback_ok[:] = False  # Reject if Greeks required
+            keep &= delta_ok | fallback_ok
+
+            # Credit = short bid - long ask (we sell short, buy long)
+            credit = short["bid"] - long["ask"]
+            keep &= credit > 0
+
+            if not keep.any():
+                continue
 
-                candidates.append(candidate)
+            # One summary line per expiration, formatted only when it will be emitted
+            fallback_used = keep & fallback_ok
+            if logger.isEnabledFor(logging.INFO) and fallback_used.any():
+                used = ", ".join(
+                    f"{strike} ({pct:.2%})"
+                    for strike, pct in zip(short_strikes[fallback_used].tolist(), otm_pct[fallback_used].tolist())
+                )
+                logger.info(f"Using OTM fallback for {symbol} {exp_str}: {used}")
+
+            # Keep the surviving pairs as columns
+            count = int(np.count_nonzero(keep))
+            tables.append(CandidateTable(
+                symbol=symbol,
+                expiration=[exp_str] * count,
+                selection_method=np.where(fallback_ok[keep], "otm_fallback", "delta").tolist(),
+                dte=np.full(count, dte),
+                short_strike=short_strikes[keep],
+                long_strike=long_strikes[keep],
+                short_delta=short["delta"][keep],
+                credit=credit[keep],
+                max_loss=config.spread_width - credit[keep],  # Max loss = spread width - credit
+                short_bid=short["bid"][keep],
+                short_ask=short["ask"][keep],
+                long_bid=long["bid"][keep],
+                long_ask=long["ask"][keep],
+                short_bidask=short["bid_ask_spread"][keep],
+                long_bidask=long["bid_ask_spread"][keep],
+                has_greeks=short["has_greeks"][keep],
+            ))
 
         except Exception as e:
             logger.error(f"Error processing expiration {exp_str} for {symbol}: {e}")
             continue
 
-    # Sort by credit (descending)
-    candidates.sort(key=lambda x: x.credit, reverse=True)
+    return CandidateTable.concat(symbol, tables)
+
 
-    return candidates
+async def find_candidates_async(symbol: str, limit: Optional[int] = None) -> List[SpreadCandidate]:
+    """Find candidate put credit spreads for a symbol, best credit first.
+
+    With a limit, only the top `limit` candidates are built and returned.
+    """
+    table = await scan_candidates_async(symbol)
+    return table.top(limit)
+
+
+def find_candidates(symbol: str, limit: Optional[int] = None) -> List[SpreadCandidate]:
+    """Find candidate put credit spreads for a symbol (blocking)."""
+    if not get_ib_conn().is_connected():
+        logger.error("Not connected to IB")
+        return []
+
+    return get_ib_conn().ib.run(find_candidates_async(symbol, limit=limit))
+
+
+async def get_top_candidates_async(symbol: str, limit: int = 5) -> List[SpreadCandidate]:
+    """Get top N candidates for a symbol without blocking the event loop."""
+    return await find_candidates_async(symbol, limit=limit)
 
 
 def get_top_candidates(symbol: str, limit: int = 5) -> List[SpreadCandidate]:
     """Get top N candidates for a symbol."""
-    candidates = find_candidates(symbol)
-    return candidates[:limit]
+    return find_candidates(symbol, limit=limit)
+
+
+async def scan_symbols_async(symbols: List[str], limit: int = 5) -> Dict[str, List[SpreadCandidate]]:
+    """Get top candidates for all symbols concurrently.
+
+    Symbols that fail or exceed SCAN_TIMEOUT_SECONDS get no candidates.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+
+    async def scan(symbol: str) -> List[SpreadCandidate]:
+        async with semaphore:
+            return await asyncio.wait_for(get_top_candidates_async(symbol, limit=limit), SCAN_TIMEOUT_SECONDS)
+
+    results = await asyncio.gather(*(scan(symbol) for symbol in symbols), return_exceptions=True)
+
+    candidates_by_symbol = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, asyncio.TimeoutError):
+            logger.warning(f"Scanning {symbol} timed out after {SCAN_TIMEOUT_SECONDS:.0f}s")
+            result = []
+        elif isinstance(result, Exception):
+            logger.error(f"Error scanning {symbol}: {result}")
+            result = []
+        candidates_by_symbol[symbol] = result
+    return candidates_by_symbol
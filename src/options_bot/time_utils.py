@@ -1,13 +1,14 @@
 """Timezone and time utilities for ET handling."""
 
-from datetime import datetime, time
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
 from typing import Optional
-import pytz
+from zoneinfo import ZoneInfo
 
 from .config import config
 
 # ET timezone
-ET = pytz.timezone(config.timezone)
+ET = ZoneInfo(config.timezone)
 
 
 def now_et() -> datetime:
@@ -15,25 +16,34 @@ def now_et() -> datetime:
     return datetime.now(ET)
 
 
+_UTC = timezone.utc
+
+
 def now_utc() -> datetime:
     """Get current time in UTC."""
-    return datetime.utcnow().replace(tzinfo=pytz.UTC)
+    return datetime.now(_UTC)
+
+
+def utcnow_naive() -> datetime:
+    """Get current UTC time as a naive datetime, the form stored in the database."""
+    return datetime.now(_UTC).replace(tzinfo=None)
 
 
 def et_to_utc(dt: datetime) -> datetime:
     """Convert ET datetime to UTC."""
     if dt.tzinfo is None:
-        dt = ET.localize(dt)
-    return dt.astimezone(pytz.UTC)
+        dt = dt.replace(tzinfo=ET)
+    return dt.astimezone(_UTC)
 
 
 def utc_to_et(dt: datetime) -> datetime:
     """Convert UTC datetime to ET."""
     if dt.tzinfo is None:
-        dt = pytz.UTC.localize(dt)
+        dt = dt.replace(tzinfo=_UTC)
     return dt.astimezone(ET)
 
 
+@lru_cache(maxsize=8)
 def parse_time(time_str: str) -> time:
     """Parse time string in HH:MM format."""
     hour, minute = map(int, time_str.split(":"))
@@ -50,13 +60,22 @@ def is_in_entry_window() -> bool:
     return window_start <= current_time <= window_end
 
 
+def parse_yyyymmdd(date_str: str) -> date:
+    """Parse an IB expiration string in YYYYMMDD format."""
+    # Slicing is much cheaper than strptime for this fixed format
+    if len(date_str) != 8:
+        raise ValueError(f"Expected YYYYMMDD, got {date_str!r}")
+    return date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:]))
+
+
 def days_to_expiration(exp_date: datetime, current_date: Optional[datetime] = None) -> int:
     """Calculate days to expiration."""
     if current_date is None:
         current_date = now_et()
-    if exp_date.tzinfo is None:
-        exp_date = ET.localize(exp_date)
-    if current_date.tzinfo is None:
-        current_date = ET.localize(current_date)
-    delta = exp_date.date() - current_date.date()
-    return delta.days
+    # Attaching a timezone keeps the wall-clock date, so compare dates directly
+    return days_to_expiration_date(exp_date.date(), current_date.date())
+
+
+def days_to_expiration_date(exp_date: date, today: date) -> int:
+    """Calculate days to expiration from plain dates."""
+    return (exp_date - today).days
@@ -18,6 +18,12 @@ def setup_test_env(monkeypatch):
     monkeypatch.setenv("TRADING_DISABLED", "true")
     monkeypatch.setenv("ACCOUNT_SIZE", "1000")
     monkeypatch.setenv("LOG_DIR", str(Path(tempfile.gettempdir()) / "test_logs"))
+
+    # Stats and quotes cached by one test must not leak into the next
+    from options_bot.strategy.risk import invalidate_daily_stats_cache
+    from options_bot.strategy.manager import invalidate_spread_debit
+    invalidate_daily_stats_cache()
+    invalidate_spread_debit()
     
     yield
     
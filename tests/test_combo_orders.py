@@ -0,0 +1,162 @@
+"""Tests for combo order construction."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from options_bot.ibkr import combo_orders
+from options_bot.ibkr.connection import IBConnection
+from options_bot.ibkr.market_data import get_option_contract
+
+
+@pytest.fixture
+def mock_ib():
+    """Connection whose mocked IB client assigns a conId per qualified contract."""
+    conn = IBConnection()
+    conn.ib = ib = MagicMock()
+    conn.connected = True
+
+    def qualify(*contracts):
+        for contract in contracts:
+            contract.conId = int(contract.strike * 100)
+        return list(contracts)
+
+    ib.qualifyContracts.side_effect = qualify
+    get_option_contract.cache_clear()  # contracts carry their conId between tests
+    with patch("options_bot.ibkr.combo_orders.get_ib_conn", return_value=conn):
+        yield ib
+    get_option_contract.cache_clear()
+
+
+def test_combo_legs_use_qualified_con_ids(mock_ib):
+    """Test the BAG legs reference the qualified option conIds."""
+    combo = combo_orders.create_combo_order("SPY", "20240119", 450.0, 449.0, "SELL", 1, 0.50)
+
+    assert combo.secType == "BAG"
+    assert [(leg.conId, leg.action) for leg in combo.comboLegs] == [(45000, "SELL"), (44900, "BUY")]
+
+
+def test_leg_qualification_is_cached(mock_ib):
+    """Test repeated combos for the same legs do not re-qualify."""
+    combo_orders.create_combo_order("SPY", "20240119", 450.0, 449.0, "SELL", 1, 0.50)
+    combo_orders.create_combo_order("SPY", "20240119", 450.0, 449.0, "BUY", 1, 0.25)
+
+    assert mock_ib.qualifyContracts.call_count == 1
+    assert len(mock_ib.qualifyContracts.call_args.args) == 2
+
+
+def test_legs_share_contracts_with_quoting(mock_ib):
+    """Test legs qualified for quotes are not qualified again for the combo."""
+    combo_orders.get_ib_conn().qualify_contracts(get_option_contract("SPY", "20240119", 450.0, "P"))
+    combo_orders.create_combo_order("SPY", "20240119", 450.0, 449.0, "SELL", 1, 0.50)
+
+    assert [len(call.args) for call in mock_ib.qualifyContracts.call_args_list] == [1, 1]
+
+
+def test_wait_for_order_returns_on_terminal_status(mock_ib):
+    """Test waiting stops as soon as IB reports a terminal status."""
+    trade = MagicMock()
+    trade.orderStatus.status = "Submitted"
+
+    def fill(timeout):
+        trade.orderStatus.status = "Filled"
+
+    mock_ib.waitOnUpdate.side_effect = fill
+
+    assert combo_orders.wait_for_order(trade, timeout=10.0) == "Filled"
+    assert mock_ib.waitOnUpdate.call_count == 1
+
+
+def test_wait_for_order_times_out(mock_ib):
+    """Test waiting gives up at the deadline if the order stays working."""
+    trade = MagicMock()
+    trade.orderStatus.status = "Submitted"
+
+    assert combo_orders.wait_for_order(trade, timeout=0.0) == "Submitted"
+    mock_ib.waitOnUpdate.assert_not_called()
+
+
+@pytest.fixture
+def open_order(mock_ib, monkeypatch):
+    """Run place_spread_order_open with trading enabled and scripted order outcomes."""
+    from options_bot.config import Config
+
+    monkeypatch.setenv("TRADING_DISABLED", "false")
+    monkeypatch.setattr(combo_orders, "config", Config())
+    placed = []
+
+    def run(status, filled=0.0):
+        def place(combo, quantity, limit_price, action):
+            trade = MagicMock()
+            trade.orderStatus.status = "Submitted"
+            placed.append(trade)
+            return trade
+
+        def wait(trade, timeout):
+            if mock_ib.cancelOrder.called:
+                trade.orderStatus.status = status
+                trade.orderStatus.filled = filled
+            return trade.orderStatus.status
+
+        with patch.object(combo_orders, "place_combo_order", side_effect=place), \
+                patch.object(combo_orders, "wait_for_order", side_effect=wait):
+            return combo_orders.place_spread_order_open("SPY", "20240119", 450.0, 449.0, 3, 0.50)
+
+    return run, placed
+
+
+def test_open_does_not_reprice_unconfirmed_cancel(open_order):
+    """Test an order still pending cancel is not followed by a new order."""
+    run, placed = open_order
+    assert run("PendingCancel") is None
+    assert len(placed) == 1
+
+
+def test_open_keeps_partial_fill(open_order):
+    """Test a cancelled partial fill returns the filled size instead of reordering."""
+    run, placed = open_order
+    result = run("Cancelled", filled=2.0)
+    assert result["quantity"] == 2
+    assert len(placed) == 1
+
+
+def test_open_reprices_after_clean_cancel(open_order):
+    """Test repricing continues once a cancel is confirmed with nothing filled."""
+    run, placed = open_order
+    assert run("Cancelled") is None
+    assert len(placed) > 1
+
+
+def test_open_waits_share_entry_retry_budget(mock_ib, monkeypatch):
+    """Test fill and cancel waits across all attempts stay within ENTRY_RETRY_SECONDS."""
+    from types import SimpleNamespace
+    from options_bot.config import Config
+
+    monkeypatch.setenv("TRADING_DISABLED", "false")
+    monkeypatch.setenv("ENTRY_RETRY_SECONDS", "10")
+    monkeypatch.setenv("ENTRY_MAX_SLIPPAGE", "0.10")
+    monkeypatch.setattr(combo_orders, "config", Config())
+    clock = [0.0]
+    monkeypatch.setattr(combo_orders, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    waits = []
+
+    def place(combo, quantity, limit_price, action):
+        trade = MagicMock()
+        trade.orderStatus.status = "Submitted"
+        trade.orderStatus.filled = 0.0
+        return trade
+
+    def wait(trade, timeout):
+        # Worst case: every wait runs to its timeout, and cancels confirm only at the end
+        timeout = max(0.0, timeout)
+        waits.append(timeout)
+        clock[0] += timeout
+        if mock_ib.cancelOrder.called and mock_ib.cancelOrder.call_args.args[0] is trade.order:
+            trade.orderStatus.status = "Cancelled"
+        return trade.orderStatus.status
+
+    with patch.object(combo_orders, "place_combo_order", side_effect=place), \
+            patch.object(combo_orders, "wait_for_order", side_effect=wait):
+        assert combo_orders.place_spread_order_open("SPY", "20240119", 450.0, 449.0, 1, 0.50) is None
+
+    assert len(waits) > 2
+    assert sum(waits) <= 10
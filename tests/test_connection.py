@@ -0,0 +1,59 @@
+"""Tests for IB connection management."""
+
+from unittest.mock import MagicMock
+
+from options_bot.ibkr.connection import IBConnection
+
+
+def make_connection() -> IBConnection:
+    """Connection with a mocked IB client marked as connected."""
+    conn = IBConnection()
+    conn.ib = MagicMock()
+    conn.connected = True
+    return conn
+
+
+def test_health_check_is_cached():
+    """Test back-to-back checks reuse the last health check."""
+    conn = make_connection()
+
+    assert conn.is_connected()
+    assert conn.is_connected()
+    assert conn.ib.accountValues.call_count == 1
+
+
+def test_health_check_cache_cleared_on_disconnect():
+    """Test disconnecting invalidates the cached health check."""
+    conn = make_connection()
+    assert conn.is_connected()
+
+    conn.disconnect()
+    assert not conn.is_connected()
+
+    conn.connected = True
+    assert conn.is_connected()
+    assert conn.ib.accountValues.call_count == 2
+
+
+def test_qualify_contracts_skips_known_contracts():
+    """Test contracts qualified on this connection are not re-qualified."""
+    from ib_insync import Stock
+
+    conn = make_connection()
+
+    def qualify(*contracts):
+        for contract in contracts:
+            contract.conId = 756733
+        return list(contracts)
+
+    conn.ib.qualifyContracts.side_effect = qualify
+    stock = Stock("SPY", "SMART", "USD")
+
+    assert conn.qualify_contracts(stock) == [stock]
+    assert conn.qualify_contracts(stock) == [stock]
+    assert conn.ib.qualifyContracts.call_count == 1
+
+    conn.disconnect()
+    conn.connected = True
+    conn.qualify_contracts(stock)
+    assert conn.ib.qualifyContracts.call_count == 2
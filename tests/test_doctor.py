@@ -0,0 +1,46 @@
+"""Tests for the doctor diagnostics command."""
+
+import io
+from unittest.mock import patch
+
+import pytest
+
+from options_bot.services import doctor
+
+
+def test_doctor_progress_not_buffered(capsys):
+    """Test step headers are printed before the slow connect runs."""
+    def connect():
+        assert "1. IB Gateway Connection" in capsys.readouterr().out
+        return False
+
+    with patch("options_bot.services.doctor.setup_logging"), \
+            patch("options_bot.services.doctor.get_ib_conn") as mock_get_conn:
+        mock_get_conn.return_value.connect.side_effect = connect
+        with pytest.raises(SystemExit):
+            doctor.run_doctor()
+
+    output = capsys.readouterr().out
+    assert "✗ Failed to connect to IB Gateway" in output
+    assert "Some checks failed" in output
+
+
+def test_summary_written_once_even_on_exit(monkeypatch):
+    """Test the summary is a single write, including when REQUIRE_GREEKS fails the run."""
+    from options_bot.config import Config
+
+    monkeypatch.setenv("REQUIRE_GREEKS", "true")
+    monkeypatch.setattr(doctor, "config", Config())
+    results = {
+        "connection": True, "account_id": "DU123456", "is_paper": True, "market_data": True,
+        "options_chain": True, "greeks_available": False, "errors": [],
+    }
+    out = io.StringIO()
+
+    with patch("sys.stdout", out), patch.object(out, "write", wraps=out.write) as mock_write:
+        with pytest.raises(SystemExit):
+            doctor._print_summary(results)
+
+    mock_write.assert_called_once()
+    assert "Account: DU123456" in out.getvalue()
+    assert "Doctor failed: REQUIRE_GREEKS=true" in out.getvalue()
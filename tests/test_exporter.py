@@ -0,0 +1,66 @@
+"""Tests for CSV export."""
+
+import csv
+from datetime import datetime
+
+import pytest
+
+from options_bot.config import Config
+from options_bot.db import repo as repo_module
+from options_bot.db.repo import Repository
+from options_bot.services import exporter
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Repository backed by a fresh database file."""
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(repo_module, "config", Config())
+    repository = Repository()
+    monkeypatch.setattr(exporter, "get_repo", lambda: repository)
+    yield repository
+    repository.engine.dispose()
+    repository.write_engine.dispose()
+
+
+def test_export_to_csv(repository, tmp_path):
+    """Test trades, orders and fills are written with ISO timestamps."""
+    trade = repository.create_trade(
+        bot_run_id=None,
+        symbol="SPY",
+        exp=datetime(2024, 1, 19),
+        short_strike=450.0,
+        long_strike=449.0,
+        qty=1,
+        credit=0.5,
+        reason_open="test"
+    )
+    order = repository.create_order(trade.id, "open", "limit", 0.5)
+    repository.create_fill(order.id, 0.5, 1)
+
+    exporter.export_to_csv(str(tmp_path / "export.csv"))
+
+    with open(tmp_path / "export_trades.csv", newline="") as f:
+        trades = list(csv.DictReader(f))
+    assert len(trades) == 1
+    assert trades[0]["symbol"] == "SPY"
+    assert trades[0]["exp"] == "2024-01-19T00:00:00"
+    assert trades[0]["ts_close"] == ""
+    assert trades[0]["reason_open"] == "test"
+
+    with open(tmp_path / "export_orders.csv", newline="") as f:
+        orders = list(csv.DictReader(f))
+    assert [o["trade_id"] for o in orders] == [str(trade.id)]
+
+    with open(tmp_path / "export_fills.csv", newline="") as f:
+        fills = list(csv.DictReader(f))
+    assert fills[0]["order_id"] == str(order.id)
+    assert fills[0]["price"] == "0.5"
+
+
+def test_export_without_csv_suffix(repository, tmp_path):
+    """Test a path without .csv still gets three distinct files."""
+    exporter.export_to_csv(str(tmp_path / "export"))
+
+    for name in ("export_trades.csv", "export_orders.csv", "export_fills.csv"):
+        assert (tmp_path / name).read_text().startswith("id,")
@@ -0,0 +1,35 @@
+"""Tests for local Black-Scholes Greeks."""
+
+import math
+
+import numpy as np
+import pytest
+
+from options_bot.strategy.greeks import bs_delta, norm_cdf, strikes_in_delta_range
+
+
+def test_norm_cdf_matches_erf():
+    """Test the vectorized CDF agrees with math.erf."""
+    x = np.linspace(-6, 6, 241)
+    expected = [0.5 * (1 + math.erf(v / math.sqrt(2))) for v in x]
+    assert norm_cdf(x) == pytest.approx(expected, abs=2e-7)
+
+
+def test_bs_delta_put_call():
+    """Test call/put deltas and their parity."""
+    strikes = np.array([400.0, 450.0, 500.0])
+    calls = bs_delta(450.0, strikes, 30 / 365, 0.2, "C")
+    puts = bs_delta(450.0, strikes, 30 / 365, 0.2, "P")
+
+    assert puts == pytest.approx(calls - 1.0)
+    assert calls[0] > 0.95 and calls[2] < 0.05
+    assert 0.5 < calls[1] < 0.56  # ATM call slightly above 0.5 with positive rate
+
+
+def test_strikes_in_delta_range_drops_itm_strikes():
+    """Test in-the-money puts are filtered out while OTM strikes remain."""
+    strikes = np.arange(400.0, 501.0, 5.0)
+    mask = strikes_in_delta_range(450.0, strikes, 14 / 365, 0.15, 0.25)
+
+    assert not mask[strikes >= 455.0].any()
+    assert mask[strikes == 435.0].all()
@@ -84,10 +84,10 @@ def test_greeks_availability():
         chain = get_option_chain("SPY")
         if chain and chain.expirations:
             exp = chain.expirations[0]
-            strikes = chain.strikes.get(exp, [])
-            if strikes:
+            strikes = chain.strikes.get(exp)
+            if strikes is not None and strikes.size:
                 # Try to get Greeks for first strike
-                opt_data = get_option_contract_with_greeks("SPY", exp, strikes[0], "P")
+                opt_data = get_option_contract_with_greeks("SPY", exp, float(strikes[0]), "P")
                 if opt_data:
                     # Verify structure
                     assert "has_greeks" in opt_data
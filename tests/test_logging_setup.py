@@ -0,0 +1,46 @@
+"""Tests for logging configuration."""
+
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+from options_bot import logging_setup
+from options_bot.config import Config
+
+
+LOGGING_FLAGS = ("logThreads", "logProcesses", "logMultiprocessing", "logAsyncioTasks")
+
+
+@pytest.fixture
+def restore_logging_globals():
+    """Put back the logging module flags setup_logging overrides."""
+    saved = {flag: getattr(logging, flag) for flag in LOGGING_FLAGS if hasattr(logging, flag)}
+    yield
+    for flag, value in saved.items():
+        setattr(logging, flag, value)
+
+
+def test_setup_logging_queues_records(tmp_path, monkeypatch, restore_logging_globals):
+    """Test records are enqueued by the root logger and written by the listener."""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(logging_setup, "config", Config())
+    root_logger = logging.getLogger()
+    saved_handlers = list(root_logger.handlers)
+
+    try:
+        logging_setup.setup_logging()
+        logging_setup.setup_logging()  # re-running replaces the listener
+        assert len(root_logger.handlers) == 1
+        assert isinstance(root_logger.handlers[0], QueueHandler)
+        assert logging.logThreads is False
+        assert logging.logProcesses is False
+
+        logging_setup.get_logger("options_bot.test").info("queued message")
+        logging_setup._stop_listener()  # flushes the queue
+
+        assert "queued message" in (tmp_path / "bot.log").read_text()
+    finally:
+        logging_setup._stop_listener()
+        root_logger.handlers[:] = saved_handlers
+
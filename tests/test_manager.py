@@ -0,0 +1,142 @@
+"""Tests for open trade management."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from options_bot.config import Config
+from options_bot.db import repo as repo_module
+from options_bot.db.repo import Repository
+from options_bot.strategy import manager
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Repository backed by a fresh database file."""
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(repo_module, "config", Config())
+    repository = Repository()
+    monkeypatch.setattr(manager, "get_repo", lambda: repository)
+    yield repository
+    repository.engine.dispose()
+    repository.write_engine.dispose()
+
+
+def make_trade(repository, symbol, short_strike, credit=0.50):
+    """Open a one-wide put spread expiring in 30 days."""
+    exp = datetime.combine((datetime.now() + timedelta(days=30)).date(), datetime.min.time())
+    return repository.create_trade(
+        bot_run_id=None, symbol=symbol, exp=exp, short_strike=short_strike,
+        long_strike=short_strike - 1.0, qty=1, credit=credit
+    )
+
+
+def test_fetch_leg_quotes_batches_then_retries():
+    """Test every leg is requested in one batch and only unquoted trades are retried."""
+    exp = datetime(2024, 1, 19)
+    trades = [
+        SimpleNamespace(symbol="SPY", exp=exp, short_strike=450.0, long_strike=449.0),
+        SimpleNamespace(symbol="QQQ", exp=exp, short_strike=380.0, long_strike=379.0),
+    ]
+
+    async def quote_all(requests):
+        return [{"ask": strike / 100} if symbol == "SPY" else None for symbol, _, strike, _ in requests]
+
+    with patch("options_bot.strategy.manager.get_option_quotes_multi_async", side_effect=quote_all) as mock_quotes:
+        quotes = asyncio.run(manager.fetch_leg_quotes_async(trades))
+
+    batch, retry = [call.args[0] for call in mock_quotes.call_args_list]
+    assert len(batch) == 4
+    assert {symbol for symbol, _, _, _ in retry} == {"QQQ"}
+    assert set(quotes) == {("SPY", "20240119", 449.0), ("SPY", "20240119", 450.0)}
+
+
+def test_fetch_leg_quotes_retry_times_out(monkeypatch):
+    """Test a hung requote is abandoned without losing the batch quotes."""
+    monkeypatch.setattr(manager, "LEG_QUOTE_TIMEOUT_SECONDS", 0.01)
+    exp = datetime(2024, 1, 19)
+    trades = [
+        SimpleNamespace(symbol="SPY", exp=exp, short_strike=450.0, long_strike=449.0),
+        SimpleNamespace(symbol="QQQ", exp=exp, short_strike=380.0, long_strike=379.0),
+    ]
+    calls = 0
+
+    async def quote_then_hang(requests):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            await asyncio.sleep(10)
+        return [{"ask": 0.10} if symbol == "SPY" else None for symbol, _, _, _ in requests]
+
+    with patch("options_bot.strategy.manager.get_option_quotes_multi_async", side_effect=quote_then_hang):
+        quotes = asyncio.run(asyncio.wait_for(manager.fetch_leg_quotes_async(trades), timeout=5))
+
+    assert {leg[0] for leg in quotes} == {"SPY"}
+
+
+def test_check_trade_exits_uses_prefetched_quotes(repository):
+    """Test exits are decided from the supplied quotes without new requests."""
+    trade = make_trade(repository, "SPY", 450.0)
+    exp_str = trade.exp.strftime("%Y%m%d")
+    quotes = {
+        ("SPY", exp_str, 450.0): {"bid": 0.10, "ask": 0.20, "has_bid_ask": True},
+        ("SPY", exp_str, 449.0): {"bid": 0.05, "ask": 0.08, "has_bid_ask": True},
+    }
+
+    with patch("options_bot.strategy.manager.get_option_contract_with_greeks") as mock_single:
+        assert manager.check_trade_exits(trade.id, quotes) == "take_profit"  # debit 0.15 <= 0.25
+        assert manager.check_trade_exits(trade.id, {}) is None  # legs missing
+    mock_single.assert_not_called()
+
+
+def test_spread_debit_cached_until_closed(repository, monkeypatch):
+    """Test a recent debit is reused by the close and dropped afterwards."""
+    from options_bot.strategy import risk
+
+    monkeypatch.setattr(risk, "get_repo", lambda: repository)
+    trade = make_trade(repository, "SPY", 450.0)
+    legs = {
+        450.0: {"bid": 0.10, "ask": 0.20, "has_bid_ask": True},
+        449.0: {"bid": 0.05, "ask": 0.08, "has_bid_ask": True},
+    }
+
+    with patch("options_bot.strategy.manager.get_option_contract_with_greeks",
+               side_effect=lambda symbol, exp, strike, right: legs[strike]) as mock_single:
+        assert manager.check_trade_exits(trade.id) == "take_profit"
+        assert manager.close_trade(trade.id, "take_profit") is True
+        assert mock_single.call_count == 2  # the close reused the exit check's quote
+
+        key = ("SPY", trade.exp.strftime("%Y%m%d"), 450.0, 449.0)
+        assert key not in manager._debit_cache
+        assert manager.get_spread_debit(*key) == pytest.approx(0.15)
+        assert mock_single.call_count == 4
+
+    assert repository.get_open_trades() == []
+
+
+def test_manage_open_trades_holds_no_session_while_quoting(repository, monkeypatch):
+    """Test a manage pass releases its read session before quoting and re-reads each trade."""
+    from options_bot.strategy import risk
+
+    monkeypatch.setattr(risk, "get_repo", lambda: repository)
+    spy = make_trade(repository, "SPY", 450.0)
+    qqq = make_trade(repository, "QQQ", 380.0)
+    checked_out = []
+
+    async def quote_all(requests):
+        checked_out.append(repository.engine.pool.checkedout())
+        # Written while quotes are in flight; the exit checks must see it
+        repository.update_trade(qqq.id, status="closed")
+        # SPY is cheap to close (take profit), QQQ would be too if still open
+        return [{"bid": 0.05, "ask": 0.10, "has_bid_ask": True} for _ in requests]
+
+    with patch("options_bot.strategy.manager.get_option_quotes_multi_async", side_effect=quote_all), \
+            patch("options_bot.strategy.manager.close_trade", wraps=manager.close_trade) as mock_close:
+        asyncio.run(manager.manage_open_trades_async())
+
+    assert checked_out == [0]
+    assert [call.args[0] for call in mock_close.call_args_list] == [spy.id]
+    assert repository.get_open_trades() == []
@@ -0,0 +1,161 @@
+"""Tests for market data retrieval."""
+
+import asyncio
+import math
+from unittest.mock import MagicMock, patch
+
+import pytest
+from ib_insync import Option, Stock
+
+from options_bot.ibkr import market_data
+
+
+@pytest.fixture
+def mock_ib():
+    """Mock IB client that runs coroutines on a fresh event loop."""
+    ib = MagicMock()
+    ib.run.side_effect = asyncio.run
+    ib.reqTickersAsync.side_effect = snapshot_after(None)  # IB never ends the snapshot
+    with patch("options_bot.ibkr.market_data.get_ib_conn") as mock_get_conn:
+        mock_get_conn.return_value.ib = ib
+        mock_get_conn.return_value.is_connected.return_value = True
+        yield ib
+
+
+def make_ticker(contract, bid=math.nan, ask=math.nan, greeks=None):
+    """Ticker stand-in with the given fields."""
+    return MagicMock(contract=contract, bid=bid, ask=ask, modelGreeks=greeks)
+
+
+def snapshot_after(delay):
+    """Stand-in for reqTickersAsync that IB ends after ``delay`` seconds, or never."""
+    async def snapshot(*contracts):
+        if delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(delay)
+        return []
+    return snapshot
+
+
+def test_get_ticker_returns_once_quote_arrives(mock_ib):
+    """Test the wait ends as soon as bid/ask are populated."""
+    contract = Stock("SPY", "SMART", "USD")
+    ticker = make_ticker(contract)
+    mock_ib.ticker.return_value = ticker
+
+    async def fill_later():
+        await asyncio.sleep(0.1)
+        ticker.bid, ticker.ask = 450.0, 450.02
+
+    async def run():
+        filler = asyncio.ensure_future(fill_later())
+        result = await market_data.get_ticker_async(contract, timeout=5.0)
+        await filler
+        return result
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=2.0)) is ticker
+    mock_ib.reqTickersAsync.assert_called_once_with(contract)
+    mock_ib.cancelMktData.assert_not_called()
+
+
+def test_get_ticker_waits_for_option_greeks(mock_ib):
+    """Test options are not ready until model Greeks arrive."""
+    option = Option("SPY", "20240119", 450.0, "P", "SMART")
+    mock_ib.ticker.return_value = make_ticker(option, bid=1.0, ask=1.05)
+
+    ticker = asyncio.run(market_data.get_ticker_async(option, timeout=0.2))
+    assert ticker.modelGreeks is None
+
+
+def test_get_ticker_stops_at_snapshot_end(mock_ib):
+    """Test an option IB sends no Greeks for returns when the snapshot ends."""
+    option = Option("SPY", "20240119", 450.0, "P", "SMART")
+    ticker = make_ticker(option)
+    mock_ib.ticker.return_value = ticker
+    mock_ib.reqTickersAsync.side_effect = snapshot_after(0.05)
+
+    coro = market_data.get_ticker_async(option, timeout=5.0)
+    assert asyncio.run(asyncio.wait_for(coro, timeout=1.0)) is ticker
+    assert ticker.modelGreeks is None
+
+
+def test_get_ticker_skips_greeks_when_not_required(mock_ib, monkeypatch):
+    """Test options are ready on bid/ask alone when REQUIRE_GREEKS is off."""
+    from options_bot.config import Config
+
+    monkeypatch.setenv("REQUIRE_GREEKS", "false")
+    monkeypatch.setattr(market_data, "config", Config())
+    option = Option("SPY", "20240119", 450.0, "P", "SMART")
+    ticker = make_ticker(option)
+    mock_ib.ticker.return_value = ticker
+
+    async def fill_later():
+        await asyncio.sleep(0.05)
+        ticker.bid, ticker.ask = 1.0, 1.05
+
+    async def run():
+        filler = asyncio.ensure_future(fill_later())
+        result = await market_data.get_ticker_async(option, timeout=5.0)
+        await filler
+        return result
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=1.0)) is ticker
+
+
+def test_repeat_quote_waits_for_fresh_ticks(mock_ib):
+    """Test a second request on a shared contract does not return the previous quote."""
+    contract = market_data.get_stock_contract("SPY")
+    ticker = make_ticker(contract)
+    mock_ib.ticker.return_value = ticker  # ib_insync reuses the ticker per contract
+
+    async def quote_after(delay, bid, ask):
+        async def fill_later():
+            await asyncio.sleep(delay)
+            ticker.bid, ticker.ask = bid, ask
+
+        filler = asyncio.ensure_future(fill_later())
+        result = await market_data.get_stock_quote_async("SPY")
+        await filler
+        return result
+
+    first = asyncio.run(quote_after(0.0, 400.0, 400.1))
+    second = asyncio.run(quote_after(0.1, 401.0, 401.1))
+
+    assert (first["bid"], first["ask"]) == (400.0, 400.1)
+    assert (second["bid"], second["ask"]) == (401.0, 401.1)
+    assert mock_ib.reqTickersAsync.call_count == 2
+
+
+def test_contracts_are_reused():
+    """Test repeated lookups return the same contract objects."""
+    assert market_data.get_stock_contract("SPY") is market_data.get_stock_contract("SPY")
+    option = market_data.get_option_contract("SPY", "20240119", 450.0, "P")
+    assert option is market_data.get_option_contract("SPY", "20240119", 450.0, "P")
+    assert option is not market_data.get_option_contract("SPY", "20240119", 449.0, "P")
+
+
+def test_stock_quote_treats_nan_as_missing(mock_ib):
+    """Test NaN ticks become None while a zero bid is kept."""
+    ticker = MagicMock(bid=0.0, ask=math.nan, last=450.0, close=math.nan)
+    with patch("options_bot.ibkr.market_data.get_ticker", return_value=ticker):
+        quote = market_data.get_stock_quote("SPY")
+
+    assert quote["bid"] == 0.0
+    assert quote["ask"] is None
+    assert quote["close"] is None
+    assert quote["has_bid_ask"] is False
+
+
+def test_option_quote_reads_model_greeks(mock_ib):
+    """Test delta comes from model Greeks and a NaN delta is dropped."""
+    ticker = MagicMock(bid=1.0, ask=1.05, last=math.nan, modelGreeks=MagicMock(delta=-0.2))
+    with patch("options_bot.ibkr.market_data.get_ticker", return_value=ticker):
+        quote = market_data.get_option_quote("SPY", "20240119", 450.0, "P")
+    assert quote["delta"] == -0.2
+    assert quote["has_greeks"] is True
+    assert quote["last"] is None
+
+    ticker.modelGreeks = MagicMock(delta=math.nan)
+    with patch("options_bot.ibkr.market_data.get_ticker", return_value=ticker):
+        quote = market_data.get_option_quote("SPY", "20240119", 450.0, "P")
+    assert quote["delta"] is None
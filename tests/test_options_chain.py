@@ -0,0 +1,166 @@
+"""Tests for option chain and quote retrieval."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from options_bot.config import Config
+from options_bot.ibkr import options_chain
+
+
+def make_ticker(contract, bid, ask, delta=None):
+    """Ticker stand-in with quotes and optional model Greeks."""
+    ticker = MagicMock()
+    ticker.contract = contract
+    ticker.bid = bid
+    ticker.ask = ask
+    ticker.modelGreeks = MagicMock(delta=delta) if delta is not None else None
+    ticker.optionGreeks = None
+    return ticker
+
+
+@pytest.fixture
+def mock_ib():
+    """Mock IB client that qualifies every strike except 445."""
+    ib = MagicMock()
+
+    async def qualify(*contracts):
+        for contract in contracts:
+            contract.conId = 0 if contract.strike == 445.0 else int(contract.strike * 100)
+        return [c for c in contracts if c.conId]
+
+    async def tickers(*contracts):
+        return [make_ticker(c, c.strike / 1000, c.strike / 1000 + 0.02, delta=-0.2) for c in contracts]
+
+    ib.qualifyContractsAsync = AsyncMock(side_effect=qualify)
+    ib.reqTickersAsync = AsyncMock(side_effect=tickers)
+    ib.run.side_effect = asyncio.run
+    with patch("options_bot.ibkr.options_chain.get_ib_conn") as mock_get_conn:
+        mock_get_conn.return_value.ib = ib
+        mock_get_conn.return_value.qualify_contracts_async = ib.qualifyContractsAsync
+        mock_get_conn.return_value.is_connected.return_value = True
+        yield ib
+
+
+def test_quotes_batch_single_round_trip(mock_ib):
+    """Test all requested options are qualified and quoted together."""
+    requests = [("20240119", 450.0, "P"), ("20240119", 445.0, "P"), ("20240119", 449.0, "P")]
+    quotes = options_chain.get_option_quotes_batch("SPY", requests)
+
+    assert mock_ib.qualifyContractsAsync.await_count == 1
+    assert mock_ib.reqTickersAsync.await_count == 1
+    assert quotes[1] is None  # failed to qualify
+    assert quotes[0]["strike"] == 450.0
+    assert quotes[0]["bid"] == pytest.approx(0.45)
+    assert quotes[0]["bid_ask_spread"] == pytest.approx(0.02)
+    assert quotes[0]["delta"] == -0.2
+    assert quotes[2]["has_bid_ask"] is True
+
+
+def test_quotes_batch_chunks_large_requests(mock_ib, monkeypatch):
+    """Test ticker requests are split to stay under the market data limit."""
+    monkeypatch.setattr(options_chain, "QUOTE_BATCH_SIZE", 2)
+    requests = [("20240119", float(strike), "P") for strike in range(400, 405)]
+    quotes = options_chain.get_option_quotes_batch("SPY", requests)
+
+    assert mock_ib.reqTickersAsync.await_count == 3
+    assert all(quote is not None for quote in quotes)
+
+
+@pytest.fixture
+def chain_cache(tmp_path, monkeypatch):
+    """Empty in-memory and on-disk chain caches."""
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(options_chain, "config", Config())
+    monkeypatch.setattr(options_chain, "_chain_cache", {})
+    return tmp_path
+
+
+def test_option_chain_cached_per_day(mock_ib, chain_cache, monkeypatch):
+    """Test the chain is fetched once per symbol per trading day."""
+    from datetime import datetime
+
+    mock_ib.reqSecDefOptParamsAsync = AsyncMock(
+        return_value=[MagicMock(expirations=["20240126", "20240119"], strikes=[450.0, 449.0])]
+    )
+    days = iter([datetime(2024, 1, 10), datetime(2024, 1, 10), datetime(2024, 1, 11)])
+    monkeypatch.setattr(options_chain, "now_et", lambda: next(days))
+
+    first = options_chain.get_option_chain("SPY")
+    second = options_chain.get_option_chain("SPY")
+    assert second is first
+    assert mock_ib.reqSecDefOptParamsAsync.await_count == 1
+    assert first.expirations == ["20240119", "20240126"]
+
+    options_chain.get_option_chain("SPY")
+    assert mock_ib.reqSecDefOptParamsAsync.await_count == 2
+
+
+def test_option_chain_persisted_for_warm_start(mock_ib, chain_cache, monkeypatch):
+    """Test a restarted process reads the day's chain from disk."""
+    from datetime import datetime
+
+    mock_ib.reqSecDefOptParamsAsync = AsyncMock(
+        return_value=[MagicMock(expirations=["20240119"], strikes=[450.0, 449.0])]
+    )
+    monkeypatch.setattr(options_chain, "now_et", lambda: datetime(2024, 1, 10))
+
+    options_chain.get_option_chain("SPY")
+    assert (chain_cache / "options_data" / "SPY" / "20240110" / "chain.json").exists()
+
+    monkeypatch.setattr(options_chain, "_chain_cache", {})  # simulate a restart
+    chain = options_chain.get_option_chain("SPY")
+    assert mock_ib.reqSecDefOptParamsAsync.await_count == 1
+    assert chain.expirations == ["20240119"]
+    assert chain.strikes["20240119"].tolist() == [449.0, 450.0]
+
+
+def test_nearest_strike():
+    """Test the nearest strike is found on either side of the price."""
+    chain = options_chain.OptionChain("SPY", ["20240119"], {"20240119": [440.0, 445.0, 450.0]})
+    assert chain.nearest_strike("20240119", 446.0) == 445.0
+    assert chain.nearest_strike("20240119", 448.0) == 450.0
+    assert chain.nearest_strike("20240119", 447.5) == 445.0  # tie goes to the lower strike
+    assert chain.nearest_strike("20240119", 100.0) == 440.0
+    assert chain.nearest_strike("20240119", 900.0) == 450.0
+    assert chain.nearest_strike("20240126", 446.0) is None
+
+
+def test_filter_expirations_by_dte(monkeypatch):
+    """Test expirations outside the DTE range or malformed are dropped."""
+    from datetime import datetime
+
+    monkeypatch.setattr(options_chain, "now_et", lambda: datetime(2024, 1, 10))
+    expirations = ["20240112", "20240117", "20240131", "bad"]
+    assert options_chain.filter_expirations_by_dte(expirations, 5, 14) == ["20240117"]
+    assert options_chain.filter_expirations_by_dte(expirations, 0, 30) == ["20240112", "20240117", "20240131"]
+
+
+def test_filter_expirations_rejects_impossible_dates(monkeypatch):
+    """Test dates that would roll over to another month are dropped."""
+    from datetime import datetime
+
+    monkeypatch.setattr(options_chain, "now_et", lambda: datetime(2024, 1, 10))
+    expirations = ["20240229", "20240230", "20241301", "20240100"]
+    assert options_chain.filter_expirations_by_dte(expirations, 0, 60) == ["20240229"]
+
+
+def test_option_chain_snapshot_keyed_by_strike(mock_ib):
+    """Test an expiration snapshot maps strikes to quotes and drops failures."""
+    snapshot = asyncio.run(options_chain.get_option_chain_snapshot_async("SPY", "20240119", [445.0, 449.0, 450.0], "P"))
+
+    assert sorted(snapshot) == [449.0, 450.0]
+    assert snapshot[449.0]["ask"] == pytest.approx(0.469)
+    assert mock_ib.reqTickersAsync.await_count == 1
+
+
+def test_quotes_batch_deduplicates_contracts(mock_ib):
+    """Test a strike requested twice is quoted once but answered twice."""
+    requests = [("20240119", 450.0, "P"), ("20240119", 449.0, "P"), ("20240119", 450.0, "P")]
+    quotes = options_chain.get_option_quotes_batch("SPY", requests)
+
+    quoted = mock_ib.reqTickersAsync.await_args.args
+    assert len(quoted) == 2
+    assert quotes[0] is not None and quotes[2] is not None
+    assert quotes[0]["strike"] == quotes[2]["strike"] == 450.0
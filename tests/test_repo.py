@@ -0,0 +1,247 @@
+"""Tests for the database repository."""
+
+import pytest
+from sqlalchemy import text
+
+from options_bot.config import Config
+from options_bot.db import repo as repo_module
+from options_bot.db.repo import Repository
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Repository backed by a fresh database file."""
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(repo_module, "config", Config())
+    repository = Repository()
+    yield repository
+    repository.engine.dispose()
+    repository.write_engine.dispose()
+
+
+def test_connections_use_wal(repository):
+    """Test pragmas are applied to pooled connections."""
+    with repository.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert conn.execute(text("PRAGMA page_size")).scalar() == 8192
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() == 268435456
+
+
+def test_create_trade_roundtrip(repository):
+    """Test trades written through the writer are visible to readers."""
+    from datetime import datetime
+
+    trade = repository.create_trade(
+        bot_run_id=None,
+        symbol="SPY",
+        exp=datetime(2024, 1, 19),
+        short_strike=450.0,
+        long_strike=449.0,
+        qty=1,
+        credit=0.50,
+    )
+    assert trade.id is not None
+
+    open_trades = repository.get_open_trades(symbol="SPY")
+    assert [t.id for t in open_trades] == [trade.id]
+
+
+def test_has_open_trade_uses_index(repository):
+    """Test the open-trade check and that SQLite answers it from an index."""
+    from datetime import datetime
+    from sqlalchemy import text
+
+    trade = repository.create_trade(
+        bot_run_id=None, symbol="SPY", exp=datetime(2024, 1, 19),
+        short_strike=450.0, long_strike=449.0, qty=1, credit=0.50,
+    )
+    assert repository.has_open_trade("SPY")
+    assert not repository.has_open_trade("QQQ")
+    repository.update_trade(trade.id, status="closed")
+    assert not repository.has_open_trade("SPY")
+
+    with repository.engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM trades WHERE symbol = 'SPY' AND status = 'open' LIMIT 1"
+        )).all()
+    assert any("USING COVERING INDEX" in row[-1] for row in plan)
+
+
+def test_get_open_symbols(repository):
+    """Test only symbols with open trades are returned."""
+    from datetime import datetime
+
+    for symbol in ("SPY", "SPY", "QQQ"):
+        trade = repository.create_trade(
+            bot_run_id=None, symbol=symbol, exp=datetime(2024, 1, 19),
+            short_strike=450.0, long_strike=449.0, qty=1, credit=0.50,
+        )
+    repository.update_trade(trade.id, status="closed")
+
+    assert repository.get_open_symbols() == {"SPY"}
+
+
+def test_create_market_snapshots_bulk(repository):
+    """Test bulk snapshot insert writes every row."""
+    from options_bot.db.schema import MarketSnapshot
+    from options_bot.json_utils import unpack
+
+    rows = [
+        {"symbol": "SPY", "underlying_px": 450.0, "data": {"strikes": [449.0, 450.0]}},
+        {"symbol": "QQQ", "underlying_px": 380.0, "data": None},
+    ]
+    assert repository.create_market_snapshots_bulk(rows) == 2
+    assert repository.create_market_snapshots_bulk([]) == 0
+
+    with repository.get_session() as session:
+        snapshots = session.query(MarketSnapshot).order_by(MarketSnapshot.id).all()
+        assert [s.symbol for s in snapshots] == ["SPY", "QQQ"]
+        assert all(s.ts is not None for s in snapshots)
+        assert unpack(snapshots[0].data_json) == {"strikes": [449.0, 450.0]}
+        assert snapshots[1].data_json is None
+
+
+def test_legacy_repo_attribute_is_shared_instance(tmp_path, monkeypatch):
+    """Test the module-level repo name resolves to the cached repository."""
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(repo_module, "config", Config())
+    repo_module.get_repo.cache_clear()
+
+    shared = repo_module.get_repo()
+    try:
+        assert repo_module.repo is shared
+        assert shared.engine.url.database == str(tmp_path / "bot.db")
+    finally:
+        shared.engine.dispose()
+        shared.write_engine.dispose()
+        repo_module.get_repo.cache_clear()
+
+
+def test_open_trades_query_uses_partial_index(repository):
+    """Test the status-only open trades lookup is served by an index."""
+    with repository.engine.connect() as conn:
+        plan = conn.execute(
+            text("EXPLAIN QUERY PLAN SELECT * FROM trades WHERE status = 'open'")
+        ).all()
+    assert any("idx_trades_open_status" in row[-1] for row in plan)
+
+
+def test_get_or_create_daily_stats_is_idempotent(repository):
+    """Test repeated lookups for a day return the same row."""
+    from datetime import date
+
+    first = repository.get_or_create_daily_stats(date(2024, 1, 19))
+    second = repository.get_or_create_daily_stats(date(2024, 1, 19))
+    other = repository.get_or_create_daily_stats(date(2024, 1, 20))
+    assert first.id == second.id
+    assert other.id != first.id
+
+
+def test_update_daily_stats_upserts(repository):
+    """Test stats updates create the day's row and only touch given fields."""
+    from datetime import date
+
+    day = date(2024, 1, 19)
+    repository.update_daily_stats(day, trades_count=1)
+    repository.update_daily_stats(day, realized_pnl=12.5, wins_count=1)
+
+    stats = repository.get_or_create_daily_stats(day)
+    assert stats.trades_count == 1
+    assert stats.realized_pnl == 12.5
+    assert stats.wins_count == 1
+    assert stats.losses_count == 0
+
+
+def test_increment_daily_stats_adds_in_place(repository):
+    """Test increments create the day's row and accumulate on existing values."""
+    from datetime import date
+
+    day = date(2024, 1, 19)
+    repository.increment_daily_stats(day, trades_delta=1)
+    repository.increment_daily_stats(day, trades_delta=1)
+    repository.increment_daily_stats(day, realized_pnl_delta=12.5, wins_delta=1)
+    repository.increment_daily_stats(day, realized_pnl_delta=-20.0, losses_delta=1)
+
+    stats = repository.get_or_create_daily_stats(day)
+    assert stats.trades_count == 2
+    assert stats.realized_pnl == -7.5
+    assert stats.wins_count == 1
+    assert stats.losses_count == 1
+    assert stats.unrealized_pnl == 0.0
+
+
+def test_create_fill_returns_inserted_row(repository):
+    """Test the RETURNING insert path yields a populated object."""
+    order = repository.create_order(trade_id=None, action="open", order_type="limit", limit_price=0.50)
+    fill = repository.create_fill(order.id, price=0.48, qty=1, raw_json="{}")
+
+    assert fill.id is not None
+    assert fill.order_id == order.id
+    assert fill.price == 0.48
+    assert fill.ts is not None
+
+
+def test_update_trade_sets_only_given_fields(repository):
+    """Test closing a trade stamps ts_close and keeps untouched fields."""
+    from datetime import datetime
+    from options_bot.db.schema import Trade
+
+    trade = repository.create_trade(
+        bot_run_id=None,
+        symbol="SPY",
+        exp=datetime(2024, 1, 19),
+        short_strike=450.0,
+        long_strike=449.0,
+        qty=1,
+        credit=0.50,
+        reason_open="test",
+    )
+    repository.update_trade(trade.id, status="closed", pnl=0.25)
+
+    with repository.get_session() as session:
+        updated = session.get(Trade, trade.id)
+        assert updated.status == "closed"
+        assert updated.pnl == 0.25
+        assert updated.ts_close is not None
+        assert updated.reason_open == "test"
+        assert updated.debit_to_close is None
+
+
+def reopen_with_legacy_rows(repository, *payloads):
+    """Insert text snapshots, mark the database unmigrated and open it again."""
+    with repository.write_engine.begin() as conn:
+        for payload in payloads:
+            conn.execute(text(
+                "INSERT INTO market_snapshots (ts, symbol, data_json) "
+                "VALUES ('2024-01-19 15:00:00', 'SPY', :payload)"
+            ), {"payload": payload})
+        conn.execute(text("PRAGMA user_version = 0"))
+    reopened = Repository()
+    reopened.engine.dispose()
+    reopened.write_engine.dispose()
+
+
+def test_legacy_text_snapshots_are_packed(repository):
+    """Test snapshots stored as JSON text are converted once on startup."""
+    from options_bot.db.schema import MarketSnapshot
+    from options_bot.json_utils import unpack
+
+    reopen_with_legacy_rows(repository, '{"bid": 1.5}', "not json")
+
+    with repository.get_session() as session:
+        good, bad = session.query(MarketSnapshot).order_by(MarketSnapshot.id).all()
+        assert unpack(good.data_json) == {"bid": 1.5}
+        assert bad.data_json == "not json"  # left alone instead of failing startup
+
+    with repository.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar() == repo_module.DB_USER_VERSION
+
+
+def test_create_market_snapshot_accepts_data_json(repository):
+    """Test the older data_json keyword still stores the payload packed."""
+    from options_bot.json_utils import unpack
+
+    snapshot = repository.create_market_snapshot("SPY", 450.0, data_json='{"bid": 1.5}')
+    assert unpack(snapshot.data_json) == {"bid": 1.5}
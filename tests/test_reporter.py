@@ -0,0 +1,41 @@
+"""Tests for the daily report."""
+
+from datetime import datetime
+
+import pytest
+
+from options_bot.config import Config
+from options_bot.db import repo as repo_module
+from options_bot.db.repo import Repository
+from options_bot.services import reporter
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Repository backed by a fresh database file."""
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(repo_module, "config", Config())
+    repository = Repository()
+    monkeypatch.setattr(reporter, "get_repo", lambda: repository)
+    yield repository
+    repository.engine.dispose()
+    repository.write_engine.dispose()
+
+
+def test_daily_report_lists_trades(repository):
+    """Test today's trades and open positions appear in the report."""
+    repository.create_trade(
+        bot_run_id=None, symbol="SPY", exp=datetime(2099, 1, 16),
+        short_strike=450.0, long_strike=449.0, qty=1, credit=0.5, reason_open="test"
+    )
+    closed_trade = repository.create_trade(
+        bot_run_id=None, symbol="QQQ", exp=datetime(2099, 1, 16),
+        short_strike=380.0, long_strike=379.0, qty=1, credit=0.4, reason_open="test"
+    )
+    repository.update_trade(closed_trade.id, status="closed", pnl=25.0)
+
+    report = reporter.generate_daily_report()
+
+    assert "Open Positions: 1" in report
+    assert "QQQ      20990116     380.0/379.0          closed     $25.00" in report
+    assert "SPY      20990116     450.0/449.0          $0.50" in report
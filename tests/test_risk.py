@@ -33,3 +33,70 @@ def test_can_open_new_trade():
     # Reason should be a string
     assert isinstance(reason, str)
     assert isinstance(can_open, bool)
+
+
+@pytest.fixture
+def stats_repo(mocker, monkeypatch):
+    """Risk module with trading enabled and a mocked repo returning today's stats."""
+    from options_bot.config import Config
+    from options_bot.strategy import risk
+
+    # Trading must be enabled or can_open_new_trade returns before reading stats
+    monkeypatch.setenv("TRADING_DISABLED", "false")
+    monkeypatch.setattr(risk, "config", Config())
+
+    mock_repo = mocker.MagicMock()
+    stats = mock_repo.get_or_create_daily_stats.return_value
+    stats.trades_count = 0
+    stats.realized_pnl = 0.0
+    stats.unrealized_pnl = 0.0
+    mocker.patch.object(risk, "get_repo", return_value=mock_repo)
+    return mock_repo
+
+
+def test_daily_stats_reused_until_invalidated(stats_repo):
+    """Reporting reads today's stats once and re-reads after an update."""
+    from options_bot.strategy import risk
+
+    risk.get_daily_pnl()
+    risk.get_daily_loss_pct()
+    risk.get_trades_today_count()
+    assert stats_repo.get_or_create_daily_stats.call_count == 1
+
+    risk.invalidate_daily_stats_cache()
+    risk.get_daily_loss_pct()
+    assert stats_repo.get_or_create_daily_stats.call_count == 2
+
+    risk.update_daily_stats_for_trade_open()
+    stats_repo.increment_daily_stats.assert_called_once()
+    risk.get_trades_today_count()
+    assert stats_repo.get_or_create_daily_stats.call_count == 3
+
+
+def test_kill_switch_reads_fresh_stats(stats_repo, mocker):
+    """A loss recorded by another process blocks trading despite a warm cache."""
+    from options_bot.strategy import risk
+
+    assert risk.get_daily_loss_pct() == 0.0  # warms the cache
+    assert risk.can_open_new_trade() == (True, "OK")
+
+    # Another process records a loss past the limit without touching our cache
+    stats_repo.get_or_create_daily_stats.return_value = mocker.MagicMock(
+        trades_count=0, realized_pnl=-100.0, unrealized_pnl=0.0
+    )
+    allowed, reason = risk.can_open_new_trade()
+    assert allowed is False
+    assert "daily loss" in reason.lower()
+    assert risk.is_daily_loss_exceeded() is True
+
+
+def test_daily_loss_pct_counts_only_losses(mocker):
+    """Test net losses are a fraction of the account and gains count as zero."""
+    from options_bot.strategy import risk
+
+    stats = mocker.MagicMock(realized_pnl=-40.0, unrealized_pnl=10.0)
+    mocker.patch.object(risk, "_get_today_stats", return_value=stats)
+    assert get_daily_loss_pct() == pytest.approx(0.03)  # $30 of $1000
+
+    stats.unrealized_pnl = 50.0
+    assert get_daily_loss_pct() == 0.0
@@ -0,0 +1,46 @@
+"""Tests for the trading session runner."""
+
+import asyncio
+from unittest.mock import patch
+
+from options_bot.services import runner
+
+
+def test_session_sleep_is_bounded_by_end_time(monkeypatch):
+    """The session wakes up at its end time rather than a full poll later."""
+    monkeypatch.setattr(runner, "SESSION_POLL_SECONDS", 60)
+    monkeypatch.setattr(runner, "is_in_entry_window", lambda: False)
+
+    with patch("options_bot.services.runner.get_repo") as mock_get_repo, \
+            patch("options_bot.services.runner.manage_open_trades_async") as mock_manage:
+        asyncio.run(asyncio.wait_for(runner.run_session_async(0.002), timeout=5))
+
+    mock_manage.assert_awaited_once()  # final pass only
+    mock_get_repo.return_value.update_bot_run.assert_called_once()
+
+
+def test_entry_pass_checks_limits_once():
+    """Limits are checked once per pass and symbols with open trades are skipped."""
+    scanned = []
+
+    async def fake_scan(symbols, limit):
+        scanned.extend(symbols)
+        return {symbol: [] for symbol in symbols}
+
+    with patch("options_bot.services.runner.can_open_new_trade", return_value=(True, "OK")) as mock_can_open, \
+            patch("options_bot.services.runner.get_repo") as mock_get_repo, \
+            patch("options_bot.services.runner.scan_symbols_async", side_effect=fake_scan):
+        mock_get_repo.return_value.get_open_symbols.return_value = {"SPY"}
+        asyncio.run(runner._run_entry_pass(bot_run_id=1))
+
+    mock_can_open.assert_called_once()
+    assert scanned == [s for s in runner.config.underlyings if s != "SPY"]
+
+
+def test_entry_pass_stops_when_limits_hit():
+    """No scan happens when new trades are not allowed."""
+    with patch("options_bot.services.runner.can_open_new_trade", return_value=(False, "limit")), \
+            patch("options_bot.services.runner.scan_symbols_async") as mock_scan:
+        asyncio.run(runner._run_entry_pass(bot_run_id=1))
+
+    mock_scan.assert_not_called()
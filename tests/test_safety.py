@@ -8,7 +8,6 @@ from options_bot.strategy.risk import (
     is_daily_loss_exceeded,
     has_open_trade_for_symbol
 )
-from options_bot.db.repo import repo
 from options_bot.db.schema import Trade, DailyStats
 from datetime import date, datetime
 
@@ -43,7 +42,8 @@ def test_max_trades_per_day():
         mock_config.max_daily_loss_pct = 0.03
         
         # Mock daily stats
-        with patch('options_bot.strategy.risk.repo') as mock_repo:
+        with patch('options_bot.strategy.risk.get_repo') as mock_get_repo:
+            mock_repo = mock_get_repo.return_value
             mock_stats = MagicMock()
             mock_stats.trades_count = 2
             mock_stats.realized_pnl = 0.0
@@ -94,3 +94,27 @@ def test_safety_checks_in_order_placement():
     # This is more of an integration test
     # The actual code should check config.trading_disabled before placing orders
     pass
+
+
+def test_config_is_immutable():
+    """Verify the shared config cannot be mutated at runtime."""
+    import dataclasses
+    from options_bot.config import get_config
+
+    assert get_config() is config
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.trading_disabled = False
+
+
+def test_config_reads_environment(monkeypatch):
+    """Verify environment overrides are parsed to the field types."""
+    from options_bot.config import Config
+
+    monkeypatch.setenv("MAX_TRADES_PER_DAY", "4")
+    monkeypatch.setenv("UNDERLYINGS", "spy, iwm")
+    monkeypatch.setenv("REQUIRE_GREEKS", "False")
+    cfg = Config()
+
+    assert cfg.max_trades_per_day == 4
+    assert cfg.underlyings == ["SPY", "IWM"]
+    assert cfg.require_greeks is False
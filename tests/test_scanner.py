@@ -0,0 +1,28 @@
+"""Tests for the scanner service."""
+
+import io
+from unittest.mock import patch
+
+from options_bot.services.scanner import print_scan_results
+from options_bot.strategy.selector import SpreadCandidate
+
+
+def test_print_scan_results_single_write():
+    """Test the report is written to stdout in one call."""
+    candidate = SpreadCandidate(
+        symbol="SPY", expiration="20240119", dte=10, short_strike=450.0, long_strike=449.0,
+        short_delta=-0.20, credit=0.50, max_loss=0.50, short_bid=0.52, short_ask=0.54,
+        long_bid=0.01, long_ask=0.02, short_bidask_spread=0.02, long_bidask_spread=0.01,
+        has_greeks=True, selection_method="delta"
+    )
+    out = io.StringIO()
+
+    with patch("sys.stdout", out), patch.object(out, "write", wraps=out.write) as mock_write:
+        print_scan_results({"SPY": [candidate], "QQQ": []})
+
+    mock_write.assert_called_once()
+    report = out.getvalue()
+    assert "SPY: 1 candidates" in report
+    assert "QQQ: No candidates found" in report
+    assert "20240119" in report and "-0.200" in report
+    assert report.endswith("=" * 80 + "\n")
@@ -1,6 +1,11 @@
 """Tests for option selection logic."""
 
+import asyncio
+from dataclasses import FrozenInstanceError
+from unittest.mock import patch
+
 import pytest
+from options_bot.strategy import selector
 from options_bot.strategy.selector import SpreadCandidate
 
 
@@ -29,3 +34,163 @@ def test_spread_candidate():
     assert candidate.credit == 0.50
     assert candidate.max_loss == 0.50
     assert candidate.has_greeks is True
+    assert not hasattr(candidate, "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        candidate.credit = 1.0
+
+
+def test_scan_symbols_runs_concurrently():
+    """Symbol scans overlap and a failing symbol yields no candidates."""
+    in_flight = 0
+    peak = 0
+
+    async def fake_top_candidates(symbol, limit):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if symbol == "IWM":
+            raise RuntimeError("boom")
+        return [f"{symbol}-{i}" for i in range(limit)]
+
+    with patch("options_bot.strategy.selector.get_top_candidates_async", side_effect=fake_top_candidates):
+        result = asyncio.run(selector.scan_symbols_async(["SPY", "QQQ", "IWM"], limit=2))
+
+    assert peak == 3
+    assert result == {"SPY": ["SPY-0", "SPY-1"], "QQQ": ["QQQ-0", "QQQ-1"], "IWM": []}
+
+
+def test_scan_symbols_times_out_slow_symbol(monkeypatch):
+    """A symbol exceeding the scan timeout gets no candidates."""
+    monkeypatch.setattr(selector, "SCAN_TIMEOUT_SECONDS", 0.05)
+
+    async def fake_top_candidates(symbol, limit):
+        await asyncio.sleep(1.0 if symbol == "QQQ" else 0)
+        return [symbol]
+
+    with patch("options_bot.strategy.selector.get_top_candidates_async", side_effect=fake_top_candidates):
+        result = asyncio.run(selector.scan_symbols_async(["SPY", "QQQ"]))
+
+    assert result == {"SPY": ["SPY"], "QQQ": []}
+
+
+def make_quote(bid, ask, delta=None):
+    """Option quote dict as returned by the snapshot helpers."""
+    return {
+        "bid": bid, "ask": ask, "bid_ask_spread": ask - bid, "delta": delta,
+        "has_bid_ask": True, "has_greeks": delta is not None,
+    }
+
+
+@pytest.fixture
+def scan_inputs(monkeypatch):
+    """Patch quote, chain and snapshot lookups for a 14 DTE SPY chain at 450."""
+    from datetime import datetime, timedelta
+    from unittest.mock import AsyncMock
+
+    from options_bot.ibkr.options_chain import OptionChain
+
+    exp = (datetime.now() + timedelta(days=14)).strftime("%Y%m%d")
+    chain = OptionChain("SPY", [exp], {exp: [float(k) for k in range(430, 456)]})
+    snapshot = {}
+
+    async def fake_snapshot(symbol, expiration, strikes, right):
+        return {strike: snapshot[strike] for strike in strikes if strike in snapshot}
+
+    monkeypatch.setattr(selector, "get_stock_quote_async",
+                        AsyncMock(return_value={"bid": 450.0, "ask": 450.02, "has_bid_ask": True}))
+    monkeypatch.setattr(selector, "get_option_chain_async", AsyncMock(return_value=chain))
+    monkeypatch.setattr(selector, "get_option_chain_snapshot_async", fake_snapshot)
+    return exp, snapshot
+
+
+def test_find_candidates_filters_pairs(scan_inputs):
+    """Test delta, liquidity and credit filters over paired strikes."""
+    exp, snapshot = scan_inputs
+    snapshot.update({
+        445.0: make_quote(1.00, 1.05, delta=-0.20),  # good short
+        444.0: make_quote(0.70, 0.75, delta=-0.17),  # long of 445, short of 444
+        443.0: make_quote(0.50, 0.70, delta=-0.15),  # spread too wide
+        440.0: make_quote(0.30, 0.32, delta=-0.10),  # delta out of range
+        439.0: make_quote(0.20, 0.22, delta=-0.08),
+    })
+
+    candidates = asyncio.run(selector.find_candidates_async("SPY"))
+
+    assert [(c.short_strike, c.long_strike) for c in candidates] == [(445.0, 444.0)]
+    candidate = candidates[0]
+    assert candidate.expiration == exp
+    assert candidate.credit == pytest.approx(0.25)
+    assert candidate.max_loss == pytest.approx(0.75)
+    assert candidate.short_delta == -0.20
+    assert candidate.selection_method == "delta"
+    assert isinstance(candidate.short_strike, float)
+
+
+def test_find_candidates_limit_keeps_top_credits(scan_inputs):
+    """Test a limit returns the same leading candidates as the full scan."""
+    _, snapshot = scan_inputs
+    snapshot.update({
+        447.0: make_quote(2.0, 2.0625, delta=-0.24),  # credit 0.3125
+        446.0: make_quote(1.625, 1.6875, delta=-0.22),  # credit 0.0625
+        445.0: make_quote(1.5, 1.5625, delta=-0.21),  # credit 0.1875
+        444.0: make_quote(1.25, 1.3125, delta=-0.20),  # credit 0.1875
+        443.0: make_quote(1.0, 1.0625, delta=-0.19),  # credit 0.1875
+        442.0: make_quote(0.75, 0.8125, delta=-0.17),
+    })
+
+    full = asyncio.run(selector.find_candidates_async("SPY"))
+    top = asyncio.run(selector.find_candidates_async("SPY", limit=3))
+
+    assert [c.short_strike for c in full] == [447.0, 443.0, 444.0, 445.0, 446.0]
+    assert top == full[:3]
+
+    table = asyncio.run(selector.scan_candidates_async("SPY"))
+    assert len(table) == 5
+    assert table.short_strike.tolist() == [443.0, 444.0, 445.0, 446.0, 447.0]  # scan order
+    assert table.top(1) == full[:1]
+    assert asyncio.run(selector.find_candidates_async("SPY", limit=0)) == []
+
+
+def test_find_candidates_otm_fallback(scan_inputs, monkeypatch):
+    """Test strikes without Greeks use the OTM fallback only when allowed."""
+    from options_bot.config import Config
+
+    _, snapshot = scan_inputs
+    snapshot.update({
+        432.0: make_quote(0.40, 0.42),  # 4.0% OTM
+        431.0: make_quote(0.20, 0.22),
+    })
+
+    assert asyncio.run(selector.find_candidates_async("SPY")) == []
+
+    monkeypatch.setenv("REQUIRE_GREEKS", "false")
+    monkeypatch.setattr(selector, "config", Config())
+    candidates = asyncio.run(selector.find_candidates_async("SPY"))
+
+    assert [(c.short_strike, c.selection_method) for c in candidates] == [(432.0, "otm_fallback")]
+    assert candidates[0].short_delta is None
+
+
+def test_find_candidates_logs_fallback_once_per_expiration(scan_inputs, monkeypatch, caplog):
+    """Test OTM fallback picks are summarized in one line per expiration."""
+    import logging
+
+    from options_bot.config import Config
+
+    exp, snapshot = scan_inputs
+    snapshot.update({
+        433.0: make_quote(0.50, 0.52),  # 3.8% OTM
+        432.0: make_quote(0.40, 0.42),  # 4.0% OTM
+        431.0: make_quote(0.20, 0.22),
+    })
+    monkeypatch.setenv("REQUIRE_GREEKS", "false")
+    monkeypatch.setattr(selector, "config", Config())
+
+    with caplog.at_level(logging.INFO, logger=selector.logger.name):
+        candidates = asyncio.run(selector.find_candidates_async("SPY"))
+
+    assert len(candidates) == 2
+    fallback_logs = [r.getMessage() for r in caplog.records if "OTM fallback" in r.getMessage()]
+    assert fallback_logs == [f"Using OTM fallback for SPY {exp}: 432.0 (4.00%), 433.0 (3.78%)"]
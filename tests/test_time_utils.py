@@ -0,0 +1,44 @@
+"""Tests for time utilities."""
+
+from datetime import date, datetime, time
+
+import pytest
+
+from options_bot.time_utils import ET, days_to_expiration, parse_time, parse_yyyymmdd
+
+
+def test_parse_time_is_memoized():
+    """Test repeated parses return the cached value."""
+    assert parse_time("10:00") == time(10, 0)
+    hits = parse_time.cache_info().hits
+    parse_time("10:00")
+    assert parse_time.cache_info().hits == hits + 1
+
+
+def test_parse_yyyymmdd():
+    """Test IB expiration strings parse like strptime and reject bad input."""
+    assert parse_yyyymmdd("20240119") == date(2024, 1, 19)
+    assert parse_yyyymmdd("20240229") == datetime.strptime("20240229", "%Y%m%d").date()
+    for bad in ("20230229", "2024011", "2024-1-19"):
+        with pytest.raises(ValueError):
+            parse_yyyymmdd(bad)
+
+
+def test_days_to_expiration_naive_and_aware():
+    """Test naive and ET-aware datetimes give the same day count."""
+    exp = datetime(2024, 1, 19)
+    now = datetime(2024, 1, 10, 15, 30)
+
+    assert days_to_expiration(exp, now) == 9
+    assert days_to_expiration(exp.replace(tzinfo=ET), now.replace(tzinfo=ET)) == 9
+    assert days_to_expiration(exp, now.replace(tzinfo=ET)) == 9
+
+
+def test_et_utc_round_trip():
+    """Test naive ET times convert to UTC with the DST offset and back."""
+    from options_bot.time_utils import et_to_utc, utc_to_et
+
+    summer = et_to_utc(datetime(2024, 7, 1, 10, 0))
+    winter = et_to_utc(datetime(2024, 1, 2, 10, 0))
+    assert (summer.hour, winter.hour) == (14, 15)
+    assert utc_to_et(datetime(2024, 7, 1, 14, 0)).hour == 10